@@ -30,9 +30,15 @@ class AppSettings:
     
     # Spracovanie
     pdf_dpi: int = 200
+    pdf_render_workers: int = 4
+    pdf_render_executor: str = "process"  # "process" alebo "thread" (PyMuPDF >= 1.23)
+    pdf_image_format: str = "jpg"  # "jpg" alebo "png"
+    jpeg_quality: int = 85
+    png_compression_level: int = 1  # zlib 0-9, nižšia = rýchlejšia
     max_retries: int = 3
     batch_size: int = 5
     ai_rate_limit_per_minute: int = 30
+    render_queue_size: int = 4
     
     # Validácia
     weight_tolerance_multiplier: float = 0.001
@@ -50,6 +56,8 @@ class AppSettings:
         
         # Voliteľné environment variables
         instance.pdf_dpi = int(os.getenv("PDF_DPI", str(instance.pdf_dpi)))
+        instance.pdf_image_format = os.getenv("PDF_IMAGE_FORMAT", instance.pdf_image_format).lower()
+        instance.pdf_render_executor = os.getenv("PDF_RENDER_EXECUTOR", instance.pdf_render_executor).lower()
         instance.max_retries = int(os.getenv("MAX_RETRIES", str(instance.max_retries)))
         instance.batch_size = int(os.getenv("BATCH_SIZE", str(instance.batch_size)))
         instance.log_level = os.getenv("LOG_LEVEL", instance.log_level)
@@ -71,6 +79,12 @@ class AppSettings:
         if self.pdf_dpi <= 0:
             raise ValueError("PDF DPI musí byť kladné číslo")
         
+        if self.pdf_image_format not in ("jpg", "png"):
+            raise ValueError("PDF image format musí byť 'jpg' alebo 'png'")
+        
+        if self.pdf_render_executor not in ("process", "thread"):
+            raise ValueError("PDF render executor musí byť 'process' alebo 'thread'")
+        
         if self.max_retries < 0:
             raise ValueError("Max retries nemôže byť záporné")
     
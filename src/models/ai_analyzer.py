@@ -12,10 +12,15 @@ import google.generativeai as genai
 
 from ..config import AppSettings
 from ..utils.exceptions import AIAnalysisError
+from ..utils.validators import format_weight
 from ..utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Pevné MIME typy podľa prípony - mimetypes na Windows číta registry a môže vrátiť
+# neštandardné typy (image/pjpeg, image/x-png), ktoré Gemini odmietne
+_IMAGE_MIME_TYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png"}
+
 # Rate limiting decorator
 def rate_limit(calls_per_minute: int = 60):
     """Decorator pre rate limiting AI volání."""
@@ -126,7 +131,8 @@ class GeminiAnalyzer:
             logger.info(f"GeminiAnalyzer inicializovaný s rate limitom {self.rate_limit_per_minute}/min")
     
     @rate_limit(calls_per_minute=30)  # Default, bude prepisaný
-    def _make_ai_call(self, model_name: str, prompt: str, image_data: Optional[bytes] = None) -> str:
+    def _make_ai_call(self, model_name: str, prompt: str, image_data: Optional[bytes] = None,
+                      image_mime_type: str = "image/png") -> str:
         """Spraví AI volanie s retry logikou."""
         try:
             model = AIModelManager.get_model(model_name)
@@ -134,7 +140,7 @@ class GeminiAnalyzer:
             if image_data:
                 # Image analysis
                 image_part = {
-                    "mime_type": "image/png",
+                    "mime_type": image_mime_type,
                     "data": image_data
                 }
                 response = model.generate_content([image_part, prompt])
@@ -179,7 +185,8 @@ class GeminiAnalyzer:
             raw_response = decorated_call(
                 model_name=self.settings.main_model,
                 prompt=prompt,
-                image_data=image_data
+                image_data=image_data,
+                image_mime_type=self._image_mime_type(image_path)
             )
             
             parsed_data = self._parse_ai_response(raw_response)
@@ -194,6 +201,11 @@ class GeminiAnalyzer:
             logger.error(f"Chyba pri analýze obrázka {image_path}: {e}")
             raise AIAnalysisError(f"Analýza obrázka zlyhala: {e}")
     
+    def _image_mime_type(self, image_path: str) -> str:
+        """Vráti MIME typ obrázka podľa prípony, inak podľa settings.pdf_image_format."""
+        extension = os.path.splitext(image_path)[1][1:].lower()
+        return _IMAGE_MIME_TYPES.get(extension) or _IMAGE_MIME_TYPES[self.settings.pdf_image_format]
+    
     def assign_customs_code(self, item_details: Dict[str, Any], customs_codes_map: Dict[str, str]) -> tuple[str, str]:
         """
         Priradí colný kód k položke pomocí AI alebo hardcoded pravidiel.
@@ -371,8 +383,8 @@ class GeminiAnalyzer:
                 
                 result.append({
                     "item_code": item["item_code"],
-                    "Final Net Weight": f"{final_net:.3f}".replace('.', ','),
-                    "Final Gross Weight": f"{final_gross:.3f}".replace('.', ',')
+                    "Final Net Weight": format_weight(final_net),
+                    "Final Gross Weight": format_weight(final_gross)
                 })
             else:
                 # Chybné položky
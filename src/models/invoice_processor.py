@@ -2,10 +2,14 @@
 Hlavný procesor faktúr - orchestruje celý workflow spracovania.
 """
 import os
+import io
 import re
+import errno
 import shutil
 import csv
-from typing import Dict, List, Any, Optional
+import queue
+import threading
+from typing import Dict, List, Any, Optional, Generator, Tuple
 from tqdm import tqdm
 
 from ..config import AppSettings, DEFAULT_CSV_HEADERS, NON_PRODUCT_KEYWORDS
@@ -13,12 +17,15 @@ from ..data.csv_loader import DataManager
 from ..models.pdf_processor import PDFProcessor
 from ..models.ai_analyzer import GeminiAnalyzer, COUNTRY_ORIGIN_OVERRIDES
 from ..utils.exceptions import IntrastatError, PDFProcessingError, AIAnalysisError
-from ..utils.validators import validate_country_code, validate_weight, validate_quantity
+from ..utils.validators import validate_country_code, validate_weight, validate_quantity, format_weight
 from ..utils.logging_config import get_logger, ProcessingMetrics
 
 
 logger = get_logger(__name__)
 
+# Značka konca renderovania v rade strán
+_RENDER_DONE = object()
+
 
 class InvoiceProcessor:
     """Hlavný procesor pre spracovanie PDF faktúr."""
@@ -94,7 +101,8 @@ class InvoiceProcessor:
         
         # Finalizácia metrík
         self.metrics.finish_processing()
-        results["summary"] = self.metrics.get_summary()
+        # Kópia - get_summary vracia zdieľaný slovník, ktorý sa ďalej aktualizuje
+        results["summary"] = dict(self.metrics.get_summary())
         
         logger.info(f"Spracovanie dokončené: {len(results['processed'])} úspešných, {len(results['failed'])} neúspešných")
         return results
@@ -118,12 +126,8 @@ class InvoiceProcessor:
         invoice_number = os.path.splitext(pdf_file)[0]  # Default fallback
         
         try:
-            # Konverzia PDF na obrázky
-            image_paths = self.pdf_processor.pdf_to_images(pdf_path)
-            logger.info(f"PDF konvertovaný na {len(image_paths)} obrázkov")
-            
-            # Analýza každej strany
-            for page_num, image_path in enumerate(image_paths, 1):
+            # Renderovanie strán beží na pozadí, analýza začína hneď po prvej strane
+            for page_num, image_path in self._iter_rendered_pages(pdf_path):
                 try:
                     logger.debug(f"Analyzujem stranu {page_num}")
                     
@@ -152,9 +156,10 @@ class InvoiceProcessor:
                     logger.error(f"Chyba pri spracovaní strany {page_num}: {e}")
                     error_item = self._create_error_item(page_num, invoice_number, str(e))
                     all_items.append(error_item)
-            
-            # Čistenie obrázkov
-            self.pdf_processor.cleanup_images(image_paths)
+                
+                finally:
+                    # Obrázok strany už nie je potrebný
+                    self.pdf_processor.discard_image(image_path)
             
             if not all_items:
                 raise IntrastatError(f"Neboli extrahované žiadne položky z PDF {pdf_file}")
@@ -187,6 +192,78 @@ class InvoiceProcessor:
             logger.error(f"Kritická chyba pri spracovaní {pdf_file}: {e}")
             raise IntrastatError(f"Chyba pri spracovaní PDF {pdf_file}: {e}")
     
+    def _iter_rendered_pages(self, pdf_path: str) -> Generator[Tuple[int, str], None, None]:
+        """
+        Renderuje strany PDF vo vlákne na pozadí a vydáva ich hneď po vytvorení.
+        
+        Renderovanie ďalších strán tak prebieha súbežne s AI analýzou
+        aktuálnej strany. Rad strán je obmedzený cez settings.render_queue_size.
+        
+        Args:
+            pdf_path: Cesta k PDF súboru
+            
+        Yields:
+            Tuple (page_number, image_path)
+            
+        Raises:
+            PDFProcessingError: Pri chybe konverzie
+        """
+        pages = queue.Queue(maxsize=self.settings.render_queue_size)
+        stop = threading.Event()
+        
+        def put(entry: Any) -> bool:
+            # Neblokuje natrvalo ak konzument skončil predčasne
+            while not stop.is_set():
+                try:
+                    pages.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce() -> None:
+            generator = self.pdf_processor.pdf_to_images_generator(pdf_path)
+            try:
+                for page in generator:
+                    if not put(page):
+                        # Konzument skončil, strana už nebude analyzovaná
+                        self.pdf_processor.discard_image(page[1])
+                        break
+            except Exception as e:
+                put(e)
+            finally:
+                generator.close()
+                put(_RENDER_DONE)
+        
+        producer = threading.Thread(target=produce, name="pdf-render", daemon=True)
+        producer.start()
+        
+        try:
+            while True:
+                entry = pages.get()
+                if entry is _RENDER_DONE:
+                    break
+                if isinstance(entry, Exception):
+                    raise entry
+                yield entry
+        
+        finally:
+            stop.set()
+            producer.join()
+            
+            # Strany vyrenderované po predčasnom ukončení
+            leftover_images = []
+            while True:
+                try:
+                    entry = pages.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(entry, tuple):
+                    leftover_images.append(entry[1])
+            
+            if leftover_images:
+                self.pdf_processor.cleanup_images(leftover_images)
+    
     def _process_page_items(self, analysis_result: Dict[str, Any], page_number: int, 
                            product_weights: Dict[str, float], invoice_number: str) -> List[Dict[str, Any]]:
         """Spracuje položky z jednej strany."""
@@ -265,7 +342,8 @@ class InvoiceProcessor:
             "Total Net Weight": "",
             "Total Gross Weight": "",
             "Colný kód": "",
-            "Popis colného kódu": ""
+            "Popis colného kódu": "",
+            "_failed": False
         }
     
     def _is_product_item(self, item_identifier: str, description: str) -> bool:
@@ -353,7 +431,7 @@ class InvoiceProcessor:
         try:
             numeric_quantity = validate_quantity(quantity)
             preliminary_weight = numeric_quantity * unit_weight
-            return f"{preliminary_weight:.3f}".replace('.', ',')
+            return format_weight(preliminary_weight)
         except Exception as e:
             logger.warning(f"Chyba pri výpočte hmotnosti pre '{item_identifier}': {e}")
             return "CHYBA_QTY"
@@ -363,7 +441,7 @@ class InvoiceProcessor:
         logger.info(f"Priradenie colných kódov pre {len(items)} položiek")
         
         for item in items:
-            if "PAGE ANALYSIS FAILED" in item.get("Item Name", ""):
+            if item.get("_failed"):
                 continue
             
             item_details = {
@@ -457,7 +535,7 @@ class InvoiceProcessor:
     
     def _is_valid_for_weight_adjustment(self, item: Dict[str, Any]) -> bool:
         """Určí či je položka vhodná pre AI úpravu hmotností."""
-        if "PAGE ANALYSIS FAILED" in item.get("Item Name", ""):
+        if item.get("_failed"):
             return False
         
         preliminary_weight = item.get("Preliminary Net Weight", "")
@@ -523,7 +601,7 @@ class InvoiceProcessor:
                     try:
                         net_val = float(str(preliminary_net).replace(',', '.'))
                         gross_val = net_val * 1.1
-                        item["Total Gross Weight"] = f"{gross_val:.3f}".replace('.', ',')
+                        item["Total Gross Weight"] = format_weight(gross_val)
                     except ValueError:
                         item["Total Gross Weight"] = preliminary_net
                 else:
@@ -544,17 +622,18 @@ class InvoiceProcessor:
         logger.info(f"Zapisujem {len(items)} položiek do CSV: {csv_path}")
         
         try:
-            with open(csv_path, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=DEFAULT_CSV_HEADERS, delimiter=';')
-                writer.writeheader()
-                
-                # Zabezpečenie že všetky položky majú všetky požadované kľúče
-                processed_rows = []
-                for item in items:
-                    row = {header: item.get(header, "") for header in DEFAULT_CSV_HEADERS}
-                    processed_rows.append(row)
-                
-                writer.writerows(processed_rows)
+            # CSV sa pripraví celý v pamäti a zapíše jedným volaním
+            buffer = io.StringIO(newline='')
+            # Položky obsahujú všetky DEFAULT_CSV_HEADERS už od vytvorenia,
+            # interné kľúče (napr. "_failed") writer ignoruje
+            writer = csv.DictWriter(
+                buffer, fieldnames=DEFAULT_CSV_HEADERS, delimiter=';', extrasaction='ignore'
+            )
+            writer.writeheader()
+            writer.writerows(items)
+            
+            with open(csv_path, 'wb') as csvfile:
+                csvfile.write(buffer.getvalue().encode('utf-8-sig'))
             
             logger.info(f"CSV súbor úspešne vytvorený: {csv_path}")
             return csv_path
@@ -582,7 +661,13 @@ class InvoiceProcessor:
         destination_path = os.path.join(self.settings.processed_pdf_dir, pdf_file)
         
         try:
-            shutil.move(source_path, destination_path)
+            try:
+                # Rovnaký súborový systém - atomický rename jedným syscallom
+                os.replace(source_path, destination_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(source_path, destination_path)
             logger.info(f"PDF presunumý do processed: {pdf_file}")
             
         except Exception as e:
@@ -603,5 +688,7 @@ class InvoiceProcessor:
             "Total Net Weight": "",
             "Total Gross Weight": "",
             "Colný kód": "",
-            "Popis colného kódu": ""
+            "Popis colného kódu": "",
+            # Príznak chybnej strany - interný, do CSV sa nezapisuje
+            "_failed": True
         } 
\ No newline at end of file
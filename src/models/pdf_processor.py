@@ -1,9 +1,21 @@
 """
 PDF Processor pre konverziu PDF súborov na obrázky.
 """
+import asyncio
+import logging
+import mmap
 import os
+import shutil
+import struct
+import tempfile
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, closing, contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Generator
+from typing import AsyncGenerator, Iterator, List, Generator, Tuple
 import fitz  # PyMuPDF
 
 from ..config import AppSettings
@@ -15,6 +27,311 @@ from ..utils.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+# O_BINARY zabráni prekladu koncov riadkov na Windows
+_IMAGE_OPEN_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _write_image_bytes(image_path: str, data: bytes) -> None:
+    """
+    Zapíše zakódovaný obrázok jedným súvislým zápisom cez file deskriptor.
+    
+    Zapisuje sa do dočasného súboru, ktorý sa potom atomicky premenuje,
+    takže pod cieľovou cestou nikdy nie je neúplný obrázok.
+    """
+    tmp_path = image_path + ".tmp"
+    fd = os.open(tmp_path, _IMAGE_OPEN_FLAGS, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, image_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+_PDF_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+
+@contextmanager
+def _open_pdf(pdf_path: str) -> Iterator["fitz.Document"]:
+    """
+    Otvorí PDF dokument nad pamäťovo mapovaným súborom.
+    
+    MuPDF číta priamo z mmap (bez kopírovania do vlastného bufferu)
+    a OS načítava len stránky súboru, ktoré sú skutočne potrebné.
+    PyMuPDF neprijíma objekt mmap priamo, preto sa odovzdáva memoryview.
+    Prázdny súbor sa nedá namapovať - otvorí sa cez cestu, aby
+    chybu ohlásil PyMuPDF.
+    """
+    fd = os.open(pdf_path, _PDF_OPEN_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        mm = mmap.mmap(fd, size, access=mmap.ACCESS_READ) if size else None
+    finally:
+        os.close(fd)
+    
+    if mm is None:
+        doc = fitz.open(pdf_path, filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+        return
+    
+    # MuPDF pri čítaní xref tabuľky skáče po súbore
+    if hasattr(mmap, "MADV_RANDOM"):
+        mm.madvise(mmap.MADV_RANDOM)
+    
+    view = memoryview(mm)
+    try:
+        doc = fitz.open(stream=view, filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+            del doc
+    finally:
+        # Buffer musí byť uvoľnený pred zatvorením mmap
+        try:
+            view.release()
+            mm.close()
+        except BufferError:
+            logger.debug(f"Mmap pre {pdf_path} sa uvoľní až garbage collectorom")
+
+
+# PNG color type podľa (počet kanálov, alfa kanál)
+_PNG_COLOR_TYPES = {(1, 0): 0, (2, 1): 4, (3, 0): 2, (4, 1): 6}
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    """Vytvorí PNG chunk s dĺžkou a CRC."""
+    return (
+        struct.pack(">I", len(data)) + chunk_type + data
+        + struct.pack(">I", zlib.crc32(chunk_type + data))
+    )
+
+
+def _fast_png_write(pix: "fitz.Pixmap", image_path: str, compression_level: int = 1) -> None:
+    """
+    Zapíše pixmapu ako minimálne PNG (IHDR + IDAT + IEND) bez filtrovania riadkov.
+    
+    Obrázky sú len dočasný vstup pre AI analýzu, preto sa vynechá
+    heuristika výberu PNG filtra a dáta sa iba skomprimujú cez zlib.
+    Iné farebné priestory (napr. CMYK) sa najprv prevedú na RGB.
+    """
+    color_type = _PNG_COLOR_TYPES.get((pix.n, int(pix.alpha)))
+    if color_type is None:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+        color_type = _PNG_COLOR_TYPES[(pix.n, int(pix.alpha))]
+    
+    width, height, stride = pix.width, pix.height, pix.stride
+    row_size = width * pix.n
+    samples = pix.samples
+    
+    # Každý riadok začína bajtom filtra 0 (None)
+    raw = b"".join(
+        b"\x00" + samples[offset:offset + row_size]
+        for offset in range(0, height * stride, stride)
+    )
+    
+    data = b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        _png_chunk(b"IDAT", zlib.compress(raw, compression_level)),
+        _png_chunk(b"IEND", b""),
+    ))
+    _write_image_bytes(image_path, data)
+
+
+def _save_pixmap(pix: "fitz.Pixmap", image_path: str, image_format: str, jpeg_quality: int,
+                 png_compression_level: int = 1) -> None:
+    """
+    Uloží pixmapu v zvolenom formáte.
+    
+    JPEG je pre AI analýzu postačujúci a jeho kódovanie je výrazne
+    rýchlejšie ako Deflate v PNG. PNG sa zapisuje bez filtrovania
+    s nastaviteľnou úrovňou zlib kompresie.
+    """
+    if image_format == "jpg":
+        _write_image_bytes(image_path, pix.tobytes("jpeg", jpg_quality=jpeg_quality))
+    else:
+        _fast_png_write(pix, image_path, png_compression_level)
+
+
+def _render_page(pdf_path: str, page_num: int, dpi: int, output_folder: str,
+                 image_format: str = "png", jpeg_quality: int = 85,
+                 png_compression_level: int = 1) -> str:
+    """
+    Vyrenderuje jednu stranu PDF do obrázka.
+    
+    Funkcia je na úrovni modulu, aby ju mohol spúšťať ProcessPoolExecutor.
+    Každé volanie si otvára vlastný dokument.
+    
+    Args:
+        pdf_path: Cesta k PDF súboru
+        page_num: Index strany (od 0)
+        dpi: Rozlíšenie obrázka
+        output_folder: Adresár pre uloženie obrázka
+        image_format: Formát obrázka ("jpg" alebo "png")
+        jpeg_quality: Kvalita JPEG kompresie
+        png_compression_level: Úroveň zlib kompresie pre PNG
+        
+    Returns:
+        Cesta k vytvorenému obrázku
+        
+    Raises:
+        PDFProcessingError: Pri chybe konverzie strany
+    """
+    try:
+        with _open_pdf(pdf_path) as doc:
+            return _render_doc_page(
+                doc, page_num, dpi, output_folder, image_format, jpeg_quality, png_compression_level
+            )
+        
+    except Exception as e:
+        raise PDFProcessingError(f"Chyba pri konverzii strany {page_num + 1}: {e}")
+
+
+def _render_doc_page(doc: "fitz.Document", page_num: int, dpi: int, output_folder: str,
+                     image_format: str, jpeg_quality: int, png_compression_level: int) -> str:
+    """Vyrenderuje stranu z už otvoreného dokumentu a vráti cestu k obrázku."""
+    page = doc.load_page(page_num)
+    
+    # Vytvorenie obrázka s nastaveným DPI (bez alfa kanála)
+    zoom = dpi / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    
+    # Generovanie názvu súboru
+    image_filename = f"page_{page_num + 1}.{image_format}"
+    image_path = os.path.join(output_folder, image_filename)
+    
+    # Uloženie obrázka
+    _save_pixmap(pix, image_path, image_format, jpeg_quality, png_compression_level)
+    return image_path
+
+
+@lru_cache(maxsize=128)
+def _pdf_info_cached(pdf_path: str, mtime_ns: int, size: int) -> dict:
+    """
+    Načíta informácie o PDF; výsledok sa cachuje podľa (cesta, mtime, veľkosť).
+    
+    Volajúci musí vrátiť kópiu, aby sa cachovaný slovník nemenil.
+    """
+    with _open_pdf(pdf_path) as doc:
+        return {
+            "filename": os.path.basename(pdf_path),
+            "page_count": doc.page_count,
+            "file_size_bytes": size,
+            "is_encrypted": doc.is_encrypted,
+            "can_modify": not doc.is_encrypted or doc.authenticate(""),
+        }
+
+
+def _count_pages(pdf_path: str) -> int:
+    """Vráti počet strán PDF."""
+    with _open_pdf(pdf_path) as doc:
+        return len(doc)
+
+
+# Prefix podadresárov dávok z pdf_to_images() a pdf_to_images_async();
+# cleanup_images ich po vyprázdnení zmaže
+_BATCH_DIR_PREFIX = "batch_"
+
+# Od verzie 1.23 PyMuPDF uvoľňuje GIL počas renderovania strany
+_THREAD_RENDER_MIN_VERSION = (1, 23)
+
+
+def _supports_thread_rendering() -> bool:
+    """Zistí, či nainštalovaná verzia PyMuPDF umožňuje renderovanie vo vláknach."""
+    try:
+        version = tuple(int(part) for part in fitz.VersionBind.split(".")[:2])
+    except (AttributeError, ValueError):
+        return False
+    return version >= _THREAD_RENDER_MIN_VERSION
+
+
+def _iter_pages_pooled(pdf_path: str, total_pages: int, max_workers: int, executor_kind: str,
+                       render_options: tuple) -> Generator[Tuple[int, str], None, None]:
+    """
+    Renderuje strany v ProcessPoolExecutor alebo ThreadPoolExecutor a vydáva ich v poradí strán.
+    
+    Naraz je zadaných najviac 2 * max_workers strán, takže pomalý konzument
+    nenechá vyrenderovať celé PDF dopredu. MuPDF dokument nie je thread-safe,
+    preto si vo vláknach každé vlákno otvorí vlastný dokument (threading.local).
+    Pri predčasnom ukončení alebo chybe sa nezačaté strany zrušia a obrázky
+    vyrenderované, ale ešte nevydané, sa zmažú.
+    
+    Args:
+        pdf_path: Cesta k PDF súboru
+        total_pages: Počet strán
+        max_workers: Počet procesov/vlákien
+        executor_kind: "process" alebo "thread"
+        render_options: (dpi, output_folder, image_format, jpeg_quality, png_compression_level)
+        
+    Yields:
+        Tuple (page_number, image_path)
+    """
+    open_docs = ExitStack()
+    
+    if executor_kind == "thread":
+        local = threading.local()
+        open_lock = threading.Lock()
+        
+        def render(page_num: int) -> str:
+            doc = getattr(local, "doc", None)
+            if doc is None:
+                with open_lock:
+                    doc = local.doc = open_docs.enter_context(_open_pdf(pdf_path))
+            try:
+                return _render_doc_page(doc, page_num, *render_options)
+            except Exception as e:
+                raise PDFProcessingError(f"Chyba pri konverzii strany {page_num + 1}: {e}")
+        
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        
+        def submit(page_num: int) -> Future:
+            return executor.submit(render, page_num)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        
+        def submit(page_num: int) -> Future:
+            return executor.submit(_render_page, pdf_path, page_num, *render_options)
+    
+    window = 2 * max_workers
+    pending = deque()
+    next_page = 0
+    
+    # Executor sa ukončí (počká na vlákna) skôr, než sa zatvoria ich dokumenty
+    with open_docs, executor:
+        try:
+            while next_page < total_pages or pending:
+                while next_page < total_pages and len(pending) < window:
+                    pending.append((next_page + 1, submit(next_page)))
+                    next_page += 1
+                
+                page_number, future = pending.popleft()
+                yield (page_number, future.result())
+        
+        finally:
+            for _, future in pending:
+                future.cancel()
+            for _, future in pending:
+                if future.cancelled():
+                    continue
+                try:
+                    os.unlink(future.result())
+                except Exception:
+                    pass
+
+
 class PDFProcessor:
     """Trieda pre spracovanie PDF súborov."""
     
@@ -22,10 +339,67 @@ class PDFProcessor:
         self.settings = settings
         logger.info(f"PDFProcessor inicializovaný s DPI: {settings.pdf_dpi}")
     
+    def _render_pages(self, pdf_path: str, output_folder: str) -> Generator[Tuple[int, str], None, None]:
+        """
+        Renderuje strany PDF do output_folder a vydáva ich v poradí strán.
+        
+        Spoločné renderovanie pre pdf_to_images a pdf_to_images_generator.
+        Strany sa renderujú paralelne v samostatných procesoch alebo vláknach
+        (pdf_render_executor, pdf_render_workers), pri jednom workerovi
+        sekvenčne z jedného otvoreného dokumentu. Obrázky vydaných strán
+        patria volajúcemu.
+        
+        Args:
+            pdf_path: Cesta k PDF súboru
+            output_folder: Existujúci adresár pre uloženie obrázkov
+            
+        Yields:
+            Tuple (page_number, image_path)
+            
+        Raises:
+            PDFProcessingError: Pri chybe konverzie strany
+        """
+        settings = self.settings
+        executor_kind = settings.pdf_render_executor
+        
+        # Nastavenia sa načítajú raz, nie pre každú stranu
+        render_options = (
+            settings.pdf_dpi, output_folder,
+            settings.pdf_image_format, settings.jpeg_quality, settings.png_compression_level
+        )
+        
+        with _open_pdf(pdf_path) as doc:
+            total_pages = len(doc)
+            logger.info(f"PDF má {total_pages} strán")
+            
+            max_workers = min(os.cpu_count() or 1, settings.pdf_render_workers, total_pages)
+            if executor_kind == "thread" and max_workers > 1 and not _supports_thread_rendering():
+                logger.warning(
+                    f"PyMuPDF {fitz.VersionBind} nepodporuje renderovanie vo vláknach, renderujem sekvenčne"
+                )
+                max_workers = 1
+            
+            if max_workers <= 1:
+                # Sekvenčne z už otvoreného dokumentu - PDF sa neotvára pre každú stranu znova
+                for page_num in range(total_pages):
+                    try:
+                        image_path = _render_doc_page(doc, page_num, *render_options)
+                    except Exception as e:
+                        raise PDFProcessingError(f"Chyba pri konverzii strany {page_num + 1}: {e}")
+                    yield (page_num + 1, image_path)
+                return
+        
+        # Paralelne až po zatvorení dokumentu - každý worker si otvára vlastný
+        yield from _iter_pages_pooled(pdf_path, total_pages, max_workers, executor_kind, render_options)
+    
     def pdf_to_images(self, pdf_path: str, output_folder: str = None) -> List[str]:
         """
         Konvertuje PDF súbor na obrázky.
         
+        Obrázky sa ukladajú do jedinečného podadresára v output_folder.
+        cleanup_images() ho po vymazaní všetkých obrázkov odstráni, pri chybe
+        konverzie sa odstráni aj s čiastočne vytvorenými obrázkami.
+        
         Args:
             pdf_path: Cesta k PDF súboru
             output_folder: Adresár pre uloženie obrázkov (voliteľné)
@@ -42,55 +416,36 @@ class PDFProcessor:
         if output_folder is None:
             output_folder = self.settings.pdf_image_dir
         
-        # Vytvorenie output adresára
+        # Vytvorenie output adresára a podadresára pre túto dávku
         Path(output_folder).mkdir(parents=True, exist_ok=True)
+        output_folder = tempfile.mkdtemp(prefix=_BATCH_DIR_PREFIX, dir=output_folder)
         
         logger.info(f"Konvertujem PDF na obrázky: {pdf_path}")
         
-        image_paths = []
-        doc = None
-        
         try:
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            logger.info(f"PDF má {total_pages} strán")
+            image_paths = [image_path for _, image_path in self._render_pages(pdf_path, output_folder)]
             
-            for page_num in range(total_pages):
-                try:
-                    page = doc.load_page(page_num)
-                    
-                    # Vytvorenie obrázka s nastaveným DPI
-                    pix = page.get_pixmap(dpi=self.settings.pdf_dpi)
-                    
-                    # Generovanie názvu súboru
-                    image_filename = f"page_{page_num + 1}.png"
-                    image_path = os.path.join(output_folder, image_filename)
-                    
-                    # Uloženie obrázka
-                    pix.save(image_path)
-                    image_paths.append(image_path)
-                    
-                    logger.debug(f"Vytvorený obrázok: {image_path}")
-                    
-                except Exception as e:
-                    logger.error(f"Chyba pri konverzii strany {page_num + 1}: {e}")
-                    raise PDFProcessingError(f"Chyba pri konverzii strany {page_num + 1}: {e}")
+            if logger.isEnabledFor(logging.DEBUG):
+                for image_path in image_paths:
+                    logger.debug("Vytvorený obrázok: %s", image_path)
             
             logger.info(f"Úspešne konvertovaných {len(image_paths)} strán z PDF")
             return image_paths
             
         except Exception as e:
             logger.error(f"Chyba pri konverzii PDF {pdf_path}: {e}")
+            # Čiastočné obrázky by volajúci nenašiel - zmaže sa celý adresár dávky
+            shutil.rmtree(output_folder, ignore_errors=True)
             raise PDFProcessingError(f"Chyba pri konverzii PDF: {e}")
-        
-        finally:
-            if doc:
-                doc.close()
     
     def pdf_to_images_generator(self, pdf_path: str, output_folder: str = None) -> Generator[tuple, None, None]:
         """
         Generátor pre konverziu PDF na obrázky - memory efficient.
         
+        Strany sa renderujú rovnako ako v pdf_to_images (aj paralelne) a
+        vydávajú sa v poradí strán. Pri predčasnom ukončení generátora sa
+        obrázky ešte nevydaných strán zmažú.
+        
         Args:
             pdf_path: Cesta k PDF súboru
             output_folder: Adresár pre uloženie obrázkov
@@ -101,51 +456,112 @@ class PDFProcessor:
         Raises:
             PDFProcessingError: Pri chybe konverzie
         """
-        validate_pdf_file(pdf_path, self.settings.max_pdf_size_mb)
+        settings = self.settings
+        validate_pdf_file(pdf_path, settings.max_pdf_size_mb)
         
         if output_folder is None:
-            output_folder = self.settings.pdf_image_dir
+            output_folder = settings.pdf_image_dir
         
         Path(output_folder).mkdir(parents=True, exist_ok=True)
         
         logger.info(f"Generujem obrázky z PDF: {pdf_path}")
-        
-        doc = None
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         try:
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            logger.info(f"PDF má {total_pages} strán (generator mode)")
+            with closing(self._render_pages(pdf_path, output_folder)) as pages:
+                for page_number, image_path in pages:
+                    if debug_enabled:
+                        logger.debug("Generovaný obrázok: %s", image_path)
+                    yield (page_number, image_path)
+        
+        except Exception as e:
+            logger.error(f"Chyba pri generovaní z PDF {pdf_path}: {e}")
+            raise PDFProcessingError(f"Chyba pri generovaní z PDF: {e}")
+    
+    async def pdf_to_images_async(self, pdf_path: str,
+                                  output_folder: str = None) -> AsyncGenerator[Tuple[int, str], None]:
+        """
+        Asynchrónny generátor obrázkov strán - neblokuje event loop.
+        
+        Strany sa renderujú v ProcessPoolExecutor do jedinečného podadresára
+        v output_folder (ako v pdf_to_images) a vracajú sa v poradí dokončenia,
+        nie v poradí strán. Pri predčasnom ukončení alebo chybe sa čakajúce
+        strany zrušia a po dobehnutí rozbehnutých sa zmaže celý adresár dávky,
+        aj s už vydanými obrázkami.
+        
+        Args:
+            pdf_path: Cesta k PDF súboru
+            output_folder: Adresár pre uloženie obrázkov
             
-            for page_num in range(total_pages):
-                try:
-                    page = doc.load_page(page_num)
-                    pix = page.get_pixmap(dpi=self.settings.pdf_dpi)
-                    
-                    image_filename = f"page_{page_num + 1}.png"
-                    image_path = os.path.join(output_folder, image_filename)
-                    
-                    pix.save(image_path)
-                    
-                    logger.debug(f"Generovaný obrázok: {image_path}")
-                    yield (page_num + 1, image_path)
-                    
-                except Exception as e:
-                    logger.error(f"Chyba pri generovaní strany {page_num + 1}: {e}")
-                    raise PDFProcessingError(f"Chyba pri generovaní strany {page_num + 1}: {e}")
+        Yields:
+            Tuple (page_number, image_path)
+            
+        Raises:
+            PDFProcessingError: Pri chybe konverzie
+        """
+        settings = self.settings
+        validate_pdf_file(pdf_path, settings.max_pdf_size_mb)
+        
+        if output_folder is None:
+            output_folder = settings.pdf_image_dir
+        
+        Path(output_folder).mkdir(parents=True, exist_ok=True)
+        
+        logger.info(f"Generujem obrázky z PDF (async): {pdf_path}")
         
+        try:
+            total_pages = await asyncio.to_thread(_count_pages, pdf_path)
         except Exception as e:
             logger.error(f"Chyba pri generovaní z PDF {pdf_path}: {e}")
             raise PDFProcessingError(f"Chyba pri generovaní z PDF: {e}")
         
+        if total_pages == 0:
+            return
+        
+        output_folder = tempfile.mkdtemp(prefix=_BATCH_DIR_PREFIX, dir=output_folder)
+        render_options = (
+            settings.pdf_dpi, output_folder,
+            settings.pdf_image_format, settings.jpeg_quality, settings.png_compression_level
+        )
+        max_workers = min(os.cpu_count() or 1, settings.pdf_render_workers, total_pages)
+        
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+        pending = {}
+        completed = False
+        
+        def discard_batch() -> None:
+            # Rozbehnuté strany sa musia dopísať, inak by adresár nešlo zmazať celý
+            executor.shutdown(wait=True, cancel_futures=True)
+            shutil.rmtree(output_folder, ignore_errors=True)
+        
+        try:
+            pending = {
+                loop.run_in_executor(executor, _render_page, pdf_path, page_num, *render_options): page_num + 1
+                for page_num in range(total_pages)
+            }
+            
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    page_number = pending.pop(future)
+                    yield (page_number, future.result())
+            completed = True
+        
         finally:
-            if doc:
-                doc.close()
+            for future in pending:
+                future.cancel()
+            if completed:
+                executor.shutdown(wait=False)
+            else:
+                await asyncio.to_thread(discard_batch)
     
     def get_pdf_info(self, pdf_path: str) -> dict:
         """
         Vráti informácie o PDF súbore.
         
+        Metadáta dokumentu sa nenačítavajú, pozri get_pdf_metadata().
+        
         Args:
             pdf_path: Cesta k PDF súboru
             
@@ -157,30 +573,40 @@ class PDFProcessor:
         """
         validate_pdf_file(pdf_path, self.settings.max_pdf_size_mb)
         
-        doc = None
-        
         try:
-            doc = fitz.open(pdf_path)
-            
-            info = {
-                "filename": os.path.basename(pdf_path),
-                "page_count": len(doc),
-                "file_size_mb": os.path.getsize(pdf_path) / (1024 * 1024),
-                "metadata": doc.metadata,
-                "is_encrypted": doc.is_encrypted,
-                "can_modify": not doc.is_encrypted or doc.authenticate(""),
-            }
+            # Jediné stat(); zmena súboru zmení mtime/veľkosť, a tým aj kľúč cache
+            file_stat = os.stat(pdf_path)
+            info = dict(_pdf_info_cached(pdf_path, file_stat.st_mtime_ns, file_stat.st_size))
             
-            logger.info(f"PDF info pre {pdf_path}: {info['page_count']} strán, {info['file_size_mb']:.2f}MB")
+            logger.info(f"PDF info pre {pdf_path}: {info['page_count']} strán, {info['file_size_bytes'] / (1024 * 1024):.2f}MB")
             return info
             
         except Exception as e:
             logger.error(f"Chyba pri čítaní PDF info pre {pdf_path}: {e}")
             raise PDFProcessingError(f"Chyba pri čítaní PDF info: {e}")
+    
+    def get_pdf_metadata(self, pdf_path: str) -> dict:
+        """
+        Vráti metadáta PDF dokumentu (autor, názov, producent, ...).
         
-        finally:
-            if doc:
-                doc.close()
+        Args:
+            pdf_path: Cesta k PDF súboru
+            
+        Returns:
+            Slovník s metadátami PDF
+            
+        Raises:
+            PDFProcessingError: Pri chybe čítania PDF
+        """
+        validate_pdf_file(pdf_path, self.settings.max_pdf_size_mb)
+        
+        try:
+            with _open_pdf(pdf_path) as doc:
+                return doc.metadata
+            
+        except Exception as e:
+            logger.error(f"Chyba pri čítaní PDF metadát pre {pdf_path}: {e}")
+            raise PDFProcessingError(f"Chyba pri čítaní PDF metadát: {e}")
     
     def cleanup_images(self, image_paths: List[str]) -> None:
         """
@@ -190,17 +616,58 @@ class PDFProcessor:
             image_paths: Zoznam ciest k obrázkom na vymazanie
         """
         logger.info(f"Čistím {len(image_paths)} dočasných obrázkov")
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        batch_dirs = set()
         
         for image_path in image_paths:
+            parent_dir = os.path.dirname(image_path)
+            if os.path.basename(parent_dir).startswith(_BATCH_DIR_PREFIX):
+                batch_dirs.add(parent_dir)
             try:
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                    logger.debug(f"Vymazaný obrázok: {image_path}")
+                os.unlink(image_path)
+                if debug_enabled:
+                    logger.debug("Vymazaný obrázok: %s", image_path)
+            except FileNotFoundError:
+                pass
             except OSError as e:
                 logger.warning(f"Nepodarilo sa vymazať obrázok {image_path}: {e}")
         
+        # Adresáre dávok sa odstránia, keď sú prázdne
+        for batch_dir in batch_dirs:
+            try:
+                os.rmdir(batch_dir)
+            except OSError:
+                pass # Ešte obsahuje obrázky (alebo už neexistuje)
+        
         logger.info("Čistenie obrázkov dokončené")
     
+    def discard_image(self, image_path: str) -> None:
+        """
+        Vymaže jeden dočasný obrázok bez INFO výpisov (pre mazanie po stranách).
+        
+        Args:
+            image_path: Cesta k obrázku na vymazanie
+        """
+        try:
+            os.unlink(image_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Nepodarilo sa vymazať obrázok {image_path}: {e}")
+        else:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Vymazaný obrázok: %s", image_path)
+    
+    def cleanup_batch(self, batch_dir: str) -> None:
+        """
+        Vymaže celý adresár dávky vytvorený v pdf_to_images(), aj s obrázkami.
+        
+        Args:
+            batch_dir: Adresár dávky s obrázkami
+        """
+        logger.info(f"Mažem adresár dávky obrázkov: {batch_dir}")
+        shutil.rmtree(batch_dir, ignore_errors=True)
+    
     def get_available_pdfs(self, directory: str = None) -> List[str]:
         """
         Vráti zoznam dostupných PDF súborov v adresári.
@@ -218,13 +685,12 @@ class PDFProcessor:
             logger.warning(f"Adresár neexistuje: {directory}")
             return []
         
-        pdf_files = []
-        
-        for filename in os.listdir(directory):
-            if filename.lower().endswith('.pdf'):
-                pdf_path = os.path.join(directory, filename)
-                if os.path.isfile(pdf_path):
-                    pdf_files.append(filename)
+        # DirEntry.is_file() využíva typ z čítania adresára, bez stat() pre každý súbor
+        with os.scandir(directory) as entries:
+            pdf_files = sorted(
+                entry.name for entry in entries
+                if entry.name.lower().endswith('.pdf') and entry.is_file()
+            )
         
         logger.info(f"Nájdených {len(pdf_files)} PDF súborov v {directory}")
-        return sorted(pdf_files) 
\ No newline at end of file
+        return pdf_files 
\ No newline at end of file
@@ -3,10 +3,20 @@ Report generator for Intrastat declarations.
 Process CSV files with invoice data and generate summary reports.
 """
 
+import csv
+import errno
+import numpy as np
 import pandas as pd
 import os
 import re
 import shutil # Added for moving files
+from functools import lru_cache
+
+try:
+    # Optional: PyArrow's multithreaded C++ CSV parser, pandas is used as a fallback
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
 
 # Define the directory for input CSVs (outputs from main.py) and output reports
 INPUT_DIR = "data_output"
@@ -22,27 +32,201 @@ SOURCE_PROCESSED_PDF_DIR = "spracovane_faktury/"
 # # New directory for PDFs after a report has been generated from their data
 # ARCHIV_FAKTUR_S_REPORTOM_DIR = "archiv_faktur_s_reportom/"
 
+# Expected non-numeric strings that should not trigger a warning.
+# These typically come from main.py for weights when data is missing/problematic.
+EXPECTED_NON_NUMERIC_PLACEHOLDERS = [
+    "NENÁJDENÉ", "CHYBA_QTY", "CHÝBAJÚ_DÁTA_HMOTNOSTI", 
+    "CHÝBA_KÓD_PRE_HMOTNOSŤ", "NOT_IN_AI_RESP", "AI_JSON_DECODE_ERR",
+    "AI_BAD_FORMAT_NON_LIST", "AI_EXCEPTION", "ERROR", "AI_SKIP_NO_VALID_ITEMS",
+    "ERR_GROSS_LT_NET", "ERR_NEGATIVE", "ERR_CONVERT", "ERR_AI_KEY_MISSING", "N/A"
+]
+PLACEHOLDER_SET = frozenset(EXPECTED_NON_NUMERIC_PLACEHOLDERS)
+# Variants with an _ERR suffix (e.g. "ERR_CONVERT_ERR_...") from main.py
+ERR_PREFIX_RE = re.compile('(?:' + '|'.join(re.escape(p) for p in EXPECTED_NON_NUMERIC_PLACEHOLDERS) + ')_ERR')
+
+# Characters not allowed in report file names (replaced with '_')
+_SANE_FILENAME_RE = re.compile(r'[^a-zA-Z0-9_.-]')
+
+# Decimal comma -> dot, applied with str.translate
+_COMMA_TRANS = str.maketrans({',': '.'})
+
+# Set once the output directories exist, so later reports skip the makedirs calls
+_DIRS_READY = False
+
+# Cached {Colný kód: Popis Colného Kódu} map, reloaded only when col_sadz.csv changes
+_SADZ_CACHE = {}
+_SADZ_MTIME = None
+
+# Explicit column types so the parser does not infer (and re-scan) them.
+# Everything is read as text: codes like 85311030 must not become integers and
+# the numeric columns may contain placeholders; they are coerced in generate_single_report.
+INPUT_DTYPES = {
+    'Colný kód': str, 'Location': str, 'description': str,
+    'Quantity': str, 'Total Price': str, 'Total Gross Weight': str, 'Total Net Weight': str,
+}
+SADZ_DTYPES = {'col_sadz': str, 'Popis': str}
+
+# The only invoice CSV columns the report needs; the rest of main.py's columns are
+# skipped by the parser. A missing one is still reported by generate_single_report.
+INPUT_COLUMNS = list(INPUT_DTYPES)
+
+# Report rows are grouped by customs code and country of origin
+REPORT_GROUP_KEYS = ['Colný kód', 'Krajina Pôvodu']
+
+# Report sum columns and the (cleaned) invoice columns they are summed from
+REPORT_SUM_COLUMNS = {
+    'Súčet_Hrubá_Hmotnosť': 'Total Gross Weight',
+    'Súčet_Čistá_Hmotnosť': 'Total Net Weight',
+    'Súčet_Počet_Kusov': 'Adjusted Quantity',
+    'Súčet_Celková_Cena': 'Adjusted Total Price',
+}
+
+# Sums are accumulated as integer millionths, so adding up the partial sums of the
+# chunks gives exactly the same result however the file was split
+SUM_SCALE = 10**6
+
+# Invoice CSVs are cleaned and aggregated in chunks of this many rows to bound memory use
+CSV_CHUNK_ROWS = 100_000
+# With PyArrow the invoice CSV is parsed incrementally in blocks of this many bytes
+CSV_BLOCK_BYTES = 1 << 20
+
+
+def _read_csv_header(csv_path):
+    """Returns the column names from the first line of a semicolon-separated CSV."""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f, delimiter=';'), [])
+
+
+def _arrow_csv_options(csv_path, dtype, decimal='.', usecols=None):
+    """Returns the PyArrow parse and convert options for a semicolon-separated CSV.
+
+    dtype columns are read as strings; with usecols only those of the listed columns
+    that exist in the file are read.
+    """
+    import pyarrow as pa
+    include_columns = []
+    if usecols is not None:
+        header = _read_csv_header(csv_path)
+        include_columns = [col for col in header if col in usecols]
+    parse_options = pacsv.ParseOptions(delimiter=';', newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        decimal_point=decimal,
+        column_types={col: pa.string() for col in dtype},
+        strings_can_be_null=True,
+        include_columns=include_columns,
+    )
+    return parse_options, convert_options
+
+
+def _read_arrow_table(csv_path, dtype, decimal='.', usecols=None):
+    """Reads a semicolon-separated CSV into a PyArrow table, dtype columns as strings."""
+    parse_options, convert_options = _arrow_csv_options(csv_path, dtype, decimal, usecols)
+    return pacsv.read_csv(csv_path, parse_options=parse_options, convert_options=convert_options)
+
+
+def _read_csv(csv_path, dtype, decimal='.'):
+    """Reads a semicolon-separated CSV into a DataFrame with the given column types.
+
+    Uses pyarrow.csv when PyArrow is installed, otherwise pd.read_csv.
+    Empty fields become NaN in both cases, like in pandas.
+    """
+    if pacsv is None:
+        return pd.read_csv(csv_path, sep=';', decimal=decimal, encoding='utf-8', dtype=dtype)
+    return _read_arrow_table(csv_path, dtype, decimal).to_pandas()
+
+
+def _iter_csv_chunks(csv_path, dtype, decimal='.', chunk_rows=None, usecols=None):
+    """Yields the CSV as DataFrames of at most chunk_rows rows.
+
+    The row index runs across the whole file (row numbers in warnings stay correct)
+    and at least one, possibly empty, frame is always yielded. With PyArrow the file
+    is read incrementally in blocks of CSV_BLOCK_BYTES and each record batch is
+    converted to pandas on its own, so only one block is held in memory at a time.
+    usecols limits the read to those columns; missing ones are silently left out.
+    """
+    chunk_rows = chunk_rows or CSV_CHUNK_ROWS
+    if pacsv is None:
+        wanted = None if usecols is None else frozenset(usecols).__contains__
+        yield from pd.read_csv(csv_path, sep=';', decimal=decimal, encoding='utf-8', dtype=dtype,
+                               usecols=wanted, chunksize=chunk_rows)
+        return
+
+    parse_options, convert_options = _arrow_csv_options(csv_path, dtype, decimal, usecols)
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+    offset = 0
+    with reader:
+        for batch in reader:
+            for start in range(0, batch.num_rows, chunk_rows):
+                chunk = batch.slice(start, chunk_rows).to_pandas()
+                chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                offset += len(chunk)
+                yield chunk
+        if offset == 0:
+            yield reader.schema.empty_table().to_pandas()
+
+
+def _write_report_csv(report_df, output_path):
+    """Writes the report as a semicolon-separated CSV.
+
+    With PyArrow the values are pre-formatted as strings (same text as pandas writes)
+    and serialized by the C++ CSV writer. Values that would need quoting are rare in
+    a report, so in that case the file is simply rewritten with pandas.
+    """
+    if pacsv is not None:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(report_df.astype(str), preserve_index=False)
+        write_options = pacsv.WriteOptions(
+            include_header=False, delimiter=';', quoting_style='none', eol=os.linesep
+        )
+        try:
+            with open(output_path, 'wb') as f:
+                # Header written by hand: PyArrow would quote the column names
+                f.write((';'.join(report_df.columns) + os.linesep).encode('utf-8'))
+                pacsv.write_csv(table, f, write_options=write_options)
+            return
+        except pa.ArrowInvalid:
+            pass
+
+    report_df.to_csv(output_path, index=False, sep=';', decimal='.') # Using semicolon as separator
+
+
 def round_report_values(df):
     """Zaokrúhľuje všetky číselné hodnoty v reporte na správny počet desatinných miest."""
-    # Zaokrúhli hmotnosti a ceny na 2 desatinné miesta
-    numeric_columns = ['Súčet Hrubá Hmotnosť', 'Súčet Čistá Hmotnosť', 'Súčet Celková Cena']
-    for col in numeric_columns:
-        if col in df.columns:
-            df[col] = df[col].round(2)
+    # Zaokrúhli hmotnosti a ceny na 2 desatinné miesta - jedným np.round nad 2D blokom.
+    # Celočíselné stĺpce netreba zaokrúhľovať (a ostanú celočíselné).
+    numeric_columns = [
+        col for col in ['Súčet Hrubá Hmotnosť', 'Súčet Čistá Hmotnosť', 'Súčet Celková Cena']
+        if col in df.columns and df[col].dtype.kind == 'f'
+    ]
+    if numeric_columns:
+        df[numeric_columns] = np.round(df[numeric_columns].to_numpy(), 2)
     
     # Zaokrúhli množstvo na 1 desatinné miesto
-    if 'Súčet Počet Kusov' in df.columns:
-        df['Súčet Počet Kusov'] = df['Súčet Počet Kusov'].round(1)
+    if 'Súčet Počet Kusov' in df.columns and df['Súčet Počet Kusov'].dtype.kind == 'f':
+        df['Súčet Počet Kusov'] = np.round(df['Súčet Počet Kusov'].to_numpy(), 1)
     
     return df
 
+@lru_cache(maxsize=16)
+def _list_csv_files_cached(directory, mtime_ns):
+    """Scans directory for CSV files; cached per directory mtime (changes on add/remove/rename)."""
+    with os.scandir(directory) as entries:
+        return tuple(entry.name for entry in entries if entry.name.endswith('.csv') and entry.is_file())
+
+
 def list_csv_files(directory):
     """Lists CSV files in the specified directory."""
-    if not os.path.exists(directory):
+    try:
+        mtime_ns = os.stat(directory).st_mtime_ns
+    except FileNotFoundError:
         print(f"Directory not found: {directory}")
         return []
-    files = [f for f in os.listdir(directory) if f.endswith('.csv') and os.path.isfile(os.path.join(directory, f))]
-    return files
+    return list(_list_csv_files_cached(directory, mtime_ns))
 
 def get_customs_code_descriptions():
     """Loads customs code descriptions from col_sadz.csv."""
@@ -53,7 +237,7 @@ def get_customs_code_descriptions():
 
     try:
         # Adjust delimiter and encoding if necessary based on actual file format
-        df_sadz = pd.read_csv(col_sadz_path, sep=';', encoding='utf-8')
+        df_sadz = _read_csv(col_sadz_path, SADZ_DTYPES)
         # Actual column names from file are 'col_sadz' and 'Popis'
         # Rename them to 'Colný kód' (lowercase k) and 'Popis Colného Kódu'
         df_sadz = df_sadz.rename(columns={'col_sadz': 'Colný kód', 'Popis': 'Popis Colného Kódu'})
@@ -68,144 +252,214 @@ def get_customs_code_descriptions():
         return pd.DataFrame()
 
 
-def generate_single_report(input_csv_path, output_csv_name, df_sadz):
-    """Generates a summary report for a single input CSV file."""
-    print(f"\nProcessing {input_csv_path}...")
+def get_customs_code_map():
+    """Returns a {Colný kód: Popis Colného Kódu} dict built from col_sadz.csv.
+
+    The file is parsed only on the first call and again when its mtime changes;
+    otherwise the cached dict is returned.
+    """
+    global _SADZ_CACHE, _SADZ_MTIME
 
+    col_sadz_path = os.path.join(DATA_DIR, "col_sadz.csv")
     try:
-        # Specify decimal separator for columns that use comma
-        df = pd.read_csv(input_csv_path, sep=';', decimal=',')
-    except FileNotFoundError:
-        print(f"Error: Input file not found: {input_csv_path}")
-        return
-    except Exception as e:
-        print(f"Error reading {input_csv_path}: {e}")
-        return
+        mtime = os.stat(col_sadz_path).st_mtime_ns
+    except OSError:
+        print(f"Error: Customs code descriptions file not found at {col_sadz_path}")
+        _SADZ_CACHE, _SADZ_MTIME = {}, None
+        return _SADZ_CACHE
 
-    # --- Step 3: Data Cleaning and Transformation ---
-    numeric_cols = ['Total Gross Weight', 'Total Net Weight', 'Quantity', 'Total Price']
-    # In main.py, these are 'Total Net Weight' and 'Total Gross Weight'. 'Quantity', 'Total Price'
-    # The CSV from main.py has: 'Číslo Faktúry', 'Kód Položky', 'Názov Položky', 'Lokalita',
-    # 'Množstvo', 'Jednotková Cena', 'Celková Cena', 'Colný Kód', 'Popis Colného Kódu',
-    # 'Preliminary Net Weight', 'Total Net Weight', 'Total Gross Weight'
+    if mtime != _SADZ_MTIME:
+        df_sadz = get_customs_code_descriptions()
+        _SADZ_CACHE = dict(zip(df_sadz['Colný kód'], df_sadz['Popis Colného Kódu'])) if not df_sadz.empty else {}
+        # An unreadable file is retried on the next call instead of caching the failure
+        _SADZ_MTIME = mtime if _SADZ_CACHE else None
+    return _SADZ_CACHE
 
-    # Rename columns from main.py's output to be more generic for processing, if needed, or use them directly.
-    # For aggregation, we need:
-    # 'Colný kód'
-    # 'Lokalita' (for 'Krajina Pôvodu')
-    # 'Total Gross Weight' (for 'Súčet Hrubá Hmotnosť')
-    # 'Total Net Weight' (for 'Súčet Čistá Hmotnosť')
-    # 'Množstvo' (for 'Súčet Počet Kusov') - This is 'Quantity' in the earlier summary, let's stick to CSV names.
-    # 'Celková Cena' (for 'Súčet Celková Cena') - This is 'Total Price' in the earlier summary.
 
-    required_cols_from_main_csv = ['Colný kód', 'Location', 'Total Gross Weight', 'Total Net Weight', 'Quantity', 'Total Price', 'description']
-    for col in required_cols_from_main_csv:
-        if col not in df.columns:
-            print(f"Error: Required column '{col}' not found in {input_csv_path}. Cannot generate report.")
-            return
+def _process_chunk(df, input_csv_path):
+    """Cleans one chunk of an invoice CSV and returns its partial per-group sums.
+
+    The sums are in SUM_SCALE fixed point, so partial results of the chunks can be
+    summed again exactly. Also returns the set of sum columns that had fractional
+    (float) values in this chunk; the others are whole numbers.
+    """
+    numeric_cols = ['Total Gross Weight', 'Total Net Weight', 'Quantity', 'Total Price']
+    group_keys = REPORT_GROUP_KEYS
 
     # Convert numerical columns to numeric, coercing errors
-    # Define a list of expected non-numeric strings that should not trigger a warning
-    # These typically come from main.py for weights when data is missing/problematic
-    expected_non_numeric_placeholders = [
-        "NENÁJDENÉ", "CHYBA_QTY", "CHÝBAJÚ_DÁTA_HMOTNOSTI", 
-        "CHÝBA_KÓD_PRE_HMOTNOSŤ", "NOT_IN_AI_RESP", "AI_JSON_DECODE_ERR",
-        "AI_BAD_FORMAT_NON_LIST", "AI_EXCEPTION", "ERROR", "AI_SKIP_NO_VALID_ITEMS",
-        "ERR_GROSS_LT_NET", "ERR_NEGATIVE", "ERR_CONVERT", "ERR_AI_KEY_MISSING", "N/A"
-    ]
-    # Include variants that might appear in CSV due to errors or AI responses (e.g. with _ERR_ suffix from main.py)
-    # This list can be expanded as needed.
+    # (expected placeholders are defined at module scope in PLACEHOLDER_SET / ERR_PREFIX_RE)
+
+    # Discount or fee rows might have their weight/price values intentionally non-numeric
+    special_row_mask = df['Colný kód'].isin(["Zľava", "Poplatok"]).to_numpy()
 
     for col in numeric_cols:
-        # Store original for comparison/warning
-        original_series = df[col].copy()
+        # Keep only a reference to the original values (df[col] is reassigned below,
+        # never modified in place, so no copy is needed) and a compact not-null mask
+        original_series = df[col]
+        was_notna = original_series.notna().to_numpy()
 
-        # If the column is of object type (likely string), attempt to replace comma with dot
-        if df[col].dtype == 'object':
+        # If the column is text (not parsed as numbers), attempt to replace comma with dot
+        if not pd.api.types.is_numeric_dtype(df[col]):
             # First, explicitly replace known placeholders with NaN before general comma replacement
             # This avoids issues if a placeholder itself contains a comma.
             # We will convert these NaNs to 0.0 later without warning.
-            for placeholder in expected_non_numeric_placeholders:
-                df[col] = df[col].replace(placeholder, pd.NA) # Replace with pandas NA
-            
-            # Now, replace commas for actual numbers
-            df[col] = df[col].str.replace(',', '.', regex=False)
-
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+            # (mask keeps the text dtype even when every value is a placeholder)
+            df[col] = df[col].mask(df[col].isin(PLACEHOLDER_SET))
+
+        numeric_values = pd.to_numeric(df[col], errors='coerce')
+
+        # Decimal commas are rare: retry only the values that failed to parse,
+        # with a one-pass character translation instead of rewriting the whole column
+        retry_mask = numeric_values.isna() & df[col].notna()
+        if retry_mask.any():
+            numeric_values[retry_mask] = pd.to_numeric(
+                df[col][retry_mask].map(lambda val: val.translate(_COMMA_TRANS) if isinstance(val, str) else val),
+                errors='coerce'
+            )
+        df[col] = numeric_values
         
-        # Identify rows where coercion introduced NaNs
-        # but the original value was not one of our expected placeholders.
-        coerced_errors = original_series[df[col].isna() & original_series.notna()]
-        for index, val in coerced_errors.items():
-            # Check if the current row corresponds to a discount or fee item
-            # These items might have their 'Colný kód' changed to "Zľava" or "Poplatok"
-            # and their weight/price values might be intentionally non-numeric or zeroed out.
-            is_special_item_row = False
-            if 'Colný kód' in df.columns: # Ensure the column exists before accessing
-                item_type_identifier = df.loc[index, 'Colný kód']
-                if item_type_identifier in ["Zľava", "Poplatok"]:
-                    is_special_item_row = True
-
-            if is_special_item_row:
-                continue # Skip warning for special rows like discount/fee
-
-            # Check if the original value (before any processing in this loop) was an expected placeholder
-            original_value_from_csv = str(original_series.loc[index]).strip()
-            is_expected_placeholder = False
-            for placeholder in expected_non_numeric_placeholders:
-                if original_value_from_csv == placeholder or original_value_from_csv.startswith(placeholder + "_ERR") :
-                    is_expected_placeholder = True
-                    break
-            
-            if not is_expected_placeholder:
-                print(f"Warning: Neočakávaná nečíselná hodnota '{val}' nájdená v stĺpci '{col}', riadok {index+2} súboru {input_csv_path}. Spracovaná ako 0.0 pre sčítanie.")
+        # Identify rows where coercion introduced NaNs but the original value
+        # was not one of our expected placeholders. The original strings are only
+        # looked at for those rows (none on a clean invoice).
+        failed = df[col].isna().to_numpy() & was_notna & ~special_row_mask
+        if failed.any():
+            failed_values = original_series[failed]
+            failed_str = failed_values.astype(str).str.strip()
+            placeholder_mask = failed_str.isin(PLACEHOLDER_SET) | failed_str.str.match(ERR_PREFIX_RE)
+            unexpected_values = failed_values[~placeholder_mask]
+
+            if not unexpected_values.empty:
+                unexpected_values = ", ".join(
+                    f"riadok {index+2}: '{val}'" for index, val in unexpected_values.items()
+                )
+                print(f"Warning: Neočakávané nečíselné hodnoty nájdené v stĺpci '{col}' súboru {input_csv_path} ({unexpected_values}). Spracované ako 0.0 pre sčítanie.")
         
         df[col] = df[col].fillna(0.0)
 
 
     # Handle 'Lokalita' for 'Krajina Pôvodu'
-    df['Krajina Pôvodu'] = df['Location'].fillna("NEŠPECIFIKOVANÁ").replace('', "NEŠPECIFIKOVANÁ")
-
-    # Prepare columns for adjusted summation based on item descriptions
-    # Ensure 'Quantity' and 'Total Price' are numeric before copying
-    df['Adjusted Quantity'] = df['Quantity'].copy()
-    df['Adjusted Total Price'] = df['Total Price'].copy()
+    # (one mask for missing and empty values, one np.where instead of fillna + replace)
+    locations = df['Location'].to_numpy(dtype=object)
+    missing_location = pd.isna(locations) | (locations == '')
+    df['Krajina Pôvodu'] = np.where(missing_location, "NEŠPECIFIKOVANÁ", locations)
 
     # Identify discount and handling fee rows based on 'description' column
-    # Using regex=False for literal string matching, case-insensitive
+    # Literal, case-insensitive substring search (no regex engine), done once per
+    # distinct description and broadcast to the rows through the factorized codes
     if 'description' in df.columns: # Ensure the column exists
-        is_discount = df['description'].str.contains("Sleva zákazníkovi", case=False, na=False, regex=False)
-        is_handling_fee = df['description'].str.contains("Manipulační poplatek", case=False, na=False, regex=False)
+        codes, unique_descriptions = pd.factorize(df['description'])
+        unique_lower = np.asarray([d.lower() for d in unique_descriptions], dtype=str)
+        # The extra False at the end is picked by code -1 (missing description)
+        is_discount = np.append(np.char.find(unique_lower, "sleva zákazníkovi") >= 0, False)[codes]
+        is_handling_fee = np.append(np.char.find(unique_lower, "manipulační poplatek") >= 0, False)[codes]
 
         # For discount rows, change 'Colný kód' and 'Location' for specific reporting
-        df.loc[is_discount, 'Colný kód'] = "Zľava"
-        df.loc[is_discount, 'Location'] = "Zľava"
+        df.loc[is_discount, ['Colný kód', 'Location']] = "Zľava"
         # For handling fee rows that might also be NEURCENE, we can also give them a specific code if desired
-        # df.loc[is_handling_fee, 'Colný kód'] = "Poplatok" # Example, if we want to separate them
-        # df.loc[is_handling_fee, 'Location'] = "Poplatok"
+        # df.loc[is_handling_fee, ['Colný kód', 'Location']] = "Poplatok" # Example, if we want to separate them
 
         # Set quantity to 0 for both discount and handling fee
-        df.loc[is_discount | is_handling_fee, 'Adjusted Quantity'] = 0
+        df['Adjusted Quantity'] = np.where(is_discount | is_handling_fee, 0, df['Quantity'].to_numpy())
         
         # Set total price to 0 for handling fee (it will be ignored in sum)
         # Discount's total price remains to be included in the sum
-        df.loc[is_handling_fee, 'Adjusted Total Price'] = 0
+        df['Adjusted Total Price'] = np.where(is_handling_fee, 0, df['Total Price'].to_numpy())
     else:
+        df['Adjusted Quantity'] = df['Quantity']
+        df['Adjusted Total Price'] = df['Total Price']
         print(f"Warning: Column 'description' not found in {input_csv_path}. Cannot apply filtering for discount/handling fee.")
 
 
     # --- Step 4: Grouping and Aggregation ---
-    grouped = df.groupby(['Colný kód', 'Krajina Pôvodu'], as_index=False).agg(
-        Súčet_Hrubá_Hmotnosť=('Total Gross Weight', 'sum'),
-        Súčet_Čistá_Hmotnosť=('Total Net Weight', 'sum'),
-        Súčet_Počet_Kusov=('Adjusted Quantity', 'sum'),
-        Súčet_Celková_Cena=('Adjusted Total Price', 'sum')
+    # Categorical keys let the groupby hash integer codes instead of strings
+    for key in group_keys:
+        df[key] = df[key].astype('category')
+
+    float_sums = set()
+    for name, col in REPORT_SUM_COLUMNS.items():
+        values = df[col].to_numpy()
+        if values.dtype.kind == 'f':
+            float_sums.add(name)
+            df[col] = np.rint(values * SUM_SCALE).astype(np.int64)
+        else:
+            df[col] = values.astype(np.int64) * SUM_SCALE
+
+    grouped = df.groupby(group_keys, as_index=False, sort=False, observed=True).agg(
+        **{name: (col, 'sum') for name, col in REPORT_SUM_COLUMNS.items()}
     )
 
+    # Back to plain strings so partial results from different chunks can be combined
+    for key in group_keys:
+        grouped[key] = grouped[key].astype(object)
+    return grouped, float_sums
+
+
+def generate_single_report(input_csv_path, output_csv_name, sadz_map):
+    """Generates a summary report for a single input CSV file.
+
+    sadz_map is the {Colný kód: Popis Colného Kódu} dict from get_customs_code_map().
+    """
+    print(f"\nProcessing {input_csv_path}...")
+
+    # Specify decimal separator for columns that use comma
+    chunks = _iter_csv_chunks(input_csv_path, INPUT_DTYPES, decimal=',', usecols=INPUT_COLUMNS)
+    try:
+        df = next(chunks)
+    except FileNotFoundError:
+        print(f"Error: Input file not found: {input_csv_path}")
+        return
+    except Exception as e:
+        print(f"Error reading {input_csv_path}: {e}")
+        return
+
+    # --- Step 3: Data Cleaning and Transformation ---
+    # In main.py, these are 'Total Net Weight' and 'Total Gross Weight'. 'Quantity', 'Total Price'
+    # The CSV from main.py has: 'Číslo Faktúry', 'Kód Položky', 'Názov Položky', 'Lokalita',
+    # 'Množstvo', 'Jednotková Cena', 'Celková Cena', 'Colný Kód', 'Popis Colného Kódu',
+    # 'Preliminary Net Weight', 'Total Net Weight', 'Total Gross Weight'
+
+    # Rename columns from main.py's output to be more generic for processing, if needed, or use them directly.
+    # For aggregation, we need:
+    # 'Colný kód'
+    # 'Lokalita' (for 'Krajina Pôvodu')
+    # 'Total Gross Weight' (for 'Súčet Hrubá Hmotnosť')
+    # 'Total Net Weight' (for 'Súčet Čistá Hmotnosť')
+    # 'Množstvo' (for 'Súčet Počet Kusov') - This is 'Quantity' in the earlier summary, let's stick to CSV names.
+    # 'Celková Cena' (for 'Súčet Celková Cena') - This is 'Total Price' in the earlier summary.
+
+    required_cols_from_main_csv = ['Colný kód', 'Location', 'Total Gross Weight', 'Total Net Weight', 'Quantity', 'Total Price', 'description']
+    for col in required_cols_from_main_csv:
+        if col not in df.columns:
+            print(f"Error: Required column '{col}' not found in {input_csv_path}. Cannot generate report.")
+            return
+
+    # Clean and aggregate chunk by chunk, then combine the (small) partial sums;
+    # the final groupby also sorts the report rows
+    partials = []
+    float_sums = set()
+    while df is not None:
+        grouped, chunk_float_sums = _process_chunk(df, input_csv_path)
+        partials.append(grouped)
+        float_sums |= chunk_float_sums
+        try:
+            df = next(chunks, None)
+        except Exception as e:
+            # A later chunk failed to parse - reported like an error in the first one
+            print(f"Error reading {input_csv_path}: {e}")
+            return
+    grouped = pd.concat(partials, ignore_index=True).groupby(REPORT_GROUP_KEYS, as_index=False).sum()
+
+    # Back from fixed point; columns with whole numbers in every chunk stay integers
+    for name in REPORT_SUM_COLUMNS:
+        if name in float_sums:
+            grouped[name] = grouped[name] / SUM_SCALE
+        else:
+            grouped[name] = grouped[name] // SUM_SCALE
+
     # --- Step 5: Adding Customs Code Descriptions ---
-    if not df_sadz.empty:
-        report_df = pd.merge(grouped, df_sadz, on='Colný kód', how='left')
-        report_df['Popis Colného Kódu'] = report_df['Popis Colného Kódu'].fillna("Popis nenájdený")
+    if sadz_map:
+        report_df = grouped.copy()
+        report_df['Popis Colného Kódu'] = report_df['Colný kód'].map(sadz_map).fillna("Popis nenájdený")
     else:
         report_df = grouped.copy()
         report_df['Popis Colného Kódu'] = "Popis nenájdený (col_sadz.csv nebol načítaný)"
@@ -230,46 +484,51 @@ def generate_single_report(input_csv_path, output_csv_name, df_sadz):
     report_df = report_df[final_columns_ordered]
 
     # Filter out NEURCENE rows where all sum values are zero
-    report_df = report_df[~(
-        (report_df['Colná sadzba'] == 'NEURCENE') &
-        (report_df['Súčet Hrubá Hmotnosť'] == 0) &
-        (report_df['Súčet Čistá Hmotnosť'] == 0) &
-        (report_df['Súčet Počet Kusov'] == 0) &
-        (report_df['Súčet Celková Cena'] == 0)
-    )]
+    # (one any() reduction over the 2D block of sums instead of four comparisons)
+    sum_columns = final_columns_ordered[2:]
+    sums = report_df[sum_columns].to_numpy()
+    is_zero_neurcene = (report_df['Colná sadzba'].to_numpy() == 'NEURCENE') & ~sums.any(axis=1)
+    report_df = report_df[~is_zero_neurcene]
 
     # --- Step 7: Zaokrúhľovanie a Spolu riadok ---
     # Vypočítaj "Spolu" riadok z pôvodných (nezaokrúhlených) agregovaných hodnôt
     # report_df v tomto bode obsahuje výsledky z df.groupby(...).agg(...)
     # tieto hodnoty by mali byť ešte presné (nezaokrúhlené na 2 des. miesta)
     
-    spolu_row = {
-        'Colná sadzba': 'Spolu',
-        'Krajina Pôvodu': '',
-        'Súčet Hrubá Hmotnosť': round(report_df['Súčet Hrubá Hmotnosť'].sum(), 2),
-        'Súčet Čistá Hmotnosť': round(report_df['Súčet Čistá Hmotnosť'].sum(), 2),
-        'Súčet Počet Kusov': round(report_df['Súčet Počet Kusov'].sum(), 1), # Množstvo sa zaokrúhľuje na 1 des. miesto
-        'Súčet Celková Cena': round(report_df['Súčet Celková Cena'].sum(), 2)
-    }
+    # One reduction over all sum columns; each total is cast back to its column's
+    # dtype (the reduction upcasts mixed int/float columns to float)
+    totals = report_df[sum_columns].sum()
+    total_decimals = {'Súčet Počet Kusov': 1} # Množstvo sa zaokrúhľuje na 1 des. miesto
+    spolu_row = ['Spolu', ''] + [
+        np.round(totals[col], total_decimals.get(col, 2)).astype(report_df[col].dtype)
+        for col in sum_columns
+    ]
     
     # Teraz zaokrúhli hodnoty v jednotlivých riadkoch pre zobrazenie
-    report_df = round_report_values(report_df)
+    report_df = round_report_values(report_df).reset_index(drop=True)
     
-    # Pridaj "Spolu" riadok (ktorý bol vypočítaný z presnejších súčtov)
-    report_df = pd.concat([report_df, pd.DataFrame([spolu_row])], ignore_index=True)
+    # Pridaj "Spolu" riadok (ktorý bol vypočítaný z presnejších súčtov) priamo, bez pd.concat
+    report_df.loc[len(report_df)] = spolu_row
 
     # --- Step 8: Saving the Report ---
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    # Creates the report and archive directories (only on the first report of the run)
+    _ensure_dirs()
 
     # Sanitize output_csv_name to ensure it's a valid filename
-    sane_output_csv_name = re.sub(r'[^a-zA-Z0-9_.-]', '_', output_csv_name)
+    sane_output_csv_name = _SANE_FILENAME_RE.sub('_', output_csv_name)
     if not sane_output_csv_name.endswith(".csv"):
         sane_output_csv_name += ".csv"
 
     output_path = os.path.join(OUTPUT_DIR, sane_output_csv_name)
     try:
-        report_df.to_csv(output_path, index=False, sep=';', decimal='.') # Using semicolon as separator
+        try:
+            _write_report_csv(report_df, output_path)
+        except FileNotFoundError:
+            if os.path.isdir(OUTPUT_DIR):
+                raise
+            # OUTPUT_DIR was removed since _ensure_dirs() ran - recreate it and retry once
+            _ensure_dirs(force=True)
+            _write_report_csv(report_df, output_path)
         print(f"Report successfully generated: {output_path}")
     except Exception as e:
         print(f"Error writing report to {output_path}: {e}")
@@ -287,33 +546,69 @@ def generate_single_report(input_csv_path, output_csv_name, df_sadz):
     # Regardless of PDF archiving outcome (it might have been archived previously, or meta missing),
     # if the report was successfully generated, we should clean up the source CSV and its .meta file from data_output.
     meta_filepath_to_delete = input_csv_path + ".meta"
-    # Delete the .meta file
-    if os.path.exists(meta_filepath_to_delete):
-        try:
-            # Ensure archive directory exists
-            os.makedirs(DATA_OUTPUT_ARCHIV_DIR, exist_ok=True)
-            # Move .meta file to archive
-            shutil.move(meta_filepath_to_delete, os.path.join(DATA_OUTPUT_ARCHIV_DIR, os.path.basename(meta_filepath_to_delete)))
-            print(f"Úspešne archivovaný meta súbor: {os.path.join(DATA_OUTPUT_ARCHIV_DIR, os.path.basename(meta_filepath_to_delete))}")
-        except Exception as e:
-            print(f"Chyba pri archivácii meta súboru {meta_filepath_to_delete} do {DATA_OUTPUT_ARCHIV_DIR}: {e}")
-    else:
+
+    # Move the .meta file to archive
+    try:
+        archived_meta_path = _archive_file(meta_filepath_to_delete, DATA_OUTPUT_ARCHIV_DIR)
+        print(f"Úspešne archivovaný meta súbor: {archived_meta_path}")
+    except FileNotFoundError:
         # This is not an error for cleanup, meta might not exist if PDF was processed by older main.py version
         print(f"Poznámka: Meta súbor {meta_filepath_to_delete} nebol nájdený na archiváciu (môže byť v poriadku).")
+    except Exception as e:
+        print(f"Chyba pri archivácii meta súboru {meta_filepath_to_delete} do {DATA_OUTPUT_ARCHIV_DIR}: {e}")
 
-    # Delete the processed data CSV file from data_output
-    if os.path.exists(input_csv_path):
-        try:
-            # Ensure archive directory exists (might be redundant if already created for .meta, but safe)
-            os.makedirs(DATA_OUTPUT_ARCHIV_DIR, exist_ok=True)
-            # Move .csv file to archive
-            shutil.move(input_csv_path, os.path.join(DATA_OUTPUT_ARCHIV_DIR, os.path.basename(input_csv_path)))
-           
-        except Exception as e:
-            print(f"Chyba pri archivácii spracovaného CSV súboru {input_csv_path} do {DATA_OUTPUT_ARCHIV_DIR}: {e}")
-    else:
+    # Move the processed data CSV file from data_output to archive
+    try:
+        _archive_file(input_csv_path, DATA_OUTPUT_ARCHIV_DIR)
+    except FileNotFoundError:
         # This case should ideally not happen if we just processed it, but good to note.
         print(f"Varovanie: Spracovaný CSV súbor {input_csv_path} nebol nájdený na archiváciu.")
+    except Exception as e:
+        print(f"Chyba pri archivácii spracovaného CSV súboru {input_csv_path} do {DATA_OUTPUT_ARCHIV_DIR}: {e}")
+
+
+def _ensure_dirs(force=False):
+    """Creates OUTPUT_DIR and DATA_OUTPUT_ARCHIV_DIR once per process.
+
+    force=True re-creates them, e.g. after one was removed during the session.
+    """
+    global _DIRS_READY
+    if _DIRS_READY and not force:
+        return
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    os.makedirs(DATA_OUTPUT_ARCHIV_DIR, exist_ok=True)
+    _DIRS_READY = True
+
+
+def _archive_file(source_path, archive_dir):
+    """Moves source_path into archive_dir and returns the new path.
+
+    Uses a single atomic os.replace (rename); shutil.move is only the fallback
+    when the archive lives on another filesystem. FileNotFoundError is raised
+    when source_path does not exist. If the archive directory was removed
+    since _ensure_dirs() ran, it is recreated and the move retried once.
+    """
+    destination_path = os.path.join(archive_dir, os.path.basename(source_path))
+    try:
+        _move_file(source_path, destination_path)
+    except FileNotFoundError:
+        if not os.path.exists(source_path):
+            raise
+        # The source is there, so the archive directory is missing
+        _ensure_dirs(force=True)
+        os.makedirs(archive_dir, exist_ok=True)
+        _move_file(source_path, destination_path)
+    return destination_path
+
+
+def _move_file(source_path, destination_path):
+    """os.replace with a shutil.move fallback across filesystems (EXDEV)."""
+    try:
+        os.replace(source_path, destination_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source_path, destination_path)
 
 
 def log_final_pdf_status(processed_data_csv_path, source_pdf_dir):
@@ -323,14 +618,24 @@ def log_final_pdf_status(processed_data_csv_path, source_pdf_dir):
     """
     meta_filepath = processed_data_csv_path + ".meta"
 
-    if not os.path.exists(meta_filepath):
-        print(f"Varovanie: Meta súbor {meta_filepath} nebol nájdený. Stav pôvodného PDF nemôže byť potvrdený.")
-        return
-
     original_pdf_filename = ""
     try:
-        with open(meta_filepath, 'r', encoding='utf-8') as mf:
-            original_pdf_filename = mf.read().strip()
+        # The payload is a single file name: raw os.read instead of the text IO stack,
+        # and FileNotFoundError from os.open instead of a separate exists() check
+        fd = os.open(meta_filepath, os.O_RDONLY)
+        try:
+            content = b""
+            while True:
+                block = os.read(fd, 4096)
+                if not block:
+                    break
+                content += block
+        finally:
+            os.close(fd)
+        original_pdf_filename = content.decode('utf-8').strip()
+    except FileNotFoundError:
+        print(f"Varovanie: Meta súbor {meta_filepath} nebol nájdený. Stav pôvodného PDF nemôže byť potvrdený.")
+        return
     except Exception as e:
         print(f"Chyba pri čítaní meta súboru {meta_filepath}: {e}. Stav pôvodného PDF nemôže byť potvrdený.")
         return
@@ -354,8 +659,8 @@ def log_final_pdf_status(processed_data_csv_path, source_pdf_dir):
 
 def main():
     """Main function to drive the report generation."""
-    df_sadz = get_customs_code_descriptions()
-    if df_sadz.empty:
+    sadz_map = get_customs_code_map()
+    if not sadz_map:
         print("Warning: Proceeding without customs code descriptions as col_sadz.csv could not be loaded or processed correctly.")
 
     input_files = list_csv_files(INPUT_DIR)
@@ -384,7 +689,7 @@ def main():
     if not output_filename:
         output_filename = default_output_name
 
-    generate_single_report(selected_csv_path, output_filename, df_sadz)
+    generate_single_report(selected_csv_path, output_filename, sadz_map)
 
 def prompt_and_generate_report(available_csvs_paths=None):
     """
@@ -450,12 +755,12 @@ def prompt_and_generate_report(available_csvs_paths=None):
         final_output_report_name += ".csv"
 
     # print("Načítavam colné kódy pre report...") # User requested less verbose output
-    df_sadz = get_customs_code_descriptions()
-    if df_sadz.empty:
+    sadz_map = get_customs_code_map()
+    if not sadz_map:
         print("Varovanie: Colné kódy neboli načítané. Report bude pokračovať bez popisov colných kódov.")
 
     print(f"Generujem report pre {selected_csv_full_path} -> {final_output_report_name}...")
-    generate_single_report(selected_csv_full_path, final_output_report_name, df_sadz)
+    generate_single_report(selected_csv_full_path, final_output_report_name, sadz_map)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -24,6 +24,7 @@ __all__ = [
     "validate_country_code",
     "validate_customs_code", 
     "validate_weight",
+    "format_weight",
     "validate_quantity",
     "validate_price",
     "validate_invoice_number",
@@ -1,15 +1,62 @@
 """
 Konfigurácia logging systému pre Intrastat aplikáciu.
 """
+import atexit
 import logging
 import logging.handlers
-import os
+import queue
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from ..config import AppSettings
 
 
+# Vlákno zapisujúce log súbory (QueueListener) z poslednej inicializácie
+_LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_listener() -> None:
+    """Zastaví QueueListener, zapíše záznamy čakajúce vo fronte aj v buffri a zavrie súbory."""
+    global _LISTENER
+    if _LISTENER is not None:
+        _LISTENER.stop()
+        for handler in _LISTENER.handlers:
+            # MemoryHandler.close() len vyprázdni buffer a zahodí target -
+            # súbor intrastat.log (RotatingFileHandler) treba zavrieť zvlášť
+            target = getattr(handler, "target", None)
+            handler.close()
+            if target is not None:
+                target.close()
+        _LISTENER = None
+
+
+# Registrované po importe logging modulu, takže sa vykoná pred logging.shutdown
+atexit.register(_stop_listener)
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter, ktorý formátuje časovú pečiatku cez strftime len raz za sekundu."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (sekunda, naformátovaný čas) v jednej n-tici - atomická výmena medzi vláknami
+        self._cached_time = (None, "")
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        """Vráti čas záznamu; strftime sa volá iba pri zmene sekundy."""
+        second = int(record.created)
+        cached_second, cached_str = self._cached_time
+        if second != cached_second:
+            cached_str = time.strftime(datefmt or self.default_time_format, self.converter(second))
+            self._cached_time = (second, cached_str)
+        if datefmt:
+            return cached_str
+        return self.default_msec_format % (cached_str, record.msecs)
+
+
 def setup_logging(settings: Optional[AppSettings] = None) -> None:
     """
     Nastaví logging systém pre aplikáciu.
@@ -27,43 +74,32 @@ def setup_logging(settings: Optional[AppSettings] = None) -> None:
         log_format = settings.log_format
         logs_dir = settings.logs_dir
     
-    # Vytvorí logs adresár ak neexistuje
-    Path(logs_dir).mkdir(parents=True, exist_ok=True)
+    # Vytvorí logs adresár ak neexistuje (Path sa použije aj pre cesty k log súborom)
+    logs_path = Path(logs_dir)
+    logs_path.mkdir(parents=True, exist_ok=True)
     
-    # Nastavenie log level
-    numeric_level = getattr(logging, log_level.upper(), logging.INFO)
+    # Nastavenie log level - priame vyhľadanie v mapovaní názvov úrovní
+    numeric_level = logging.getLevelNamesMapping().get(log_level.upper(), logging.INFO)
     
     # Vytvorenie formattera
-    formatter = logging.Formatter(log_format)
-    
-    # Root logger konfigurácia
-    root_logger = logging.getLogger()
-    root_logger.setLevel(numeric_level)
-    
-    # Vyčistenie existujúcich handlers
-    for handler in root_logger.handlers[:]:
-        root_logger.removeHandler(handler)
+    formatter = CachedTimeFormatter(log_format)
     
     # Console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler s rotáciou
-    log_file = os.path.join(logs_dir, "intrastat.log")
+    log_file = logs_path / "intrastat.log"
     file_handler = logging.handlers.RotatingFileHandler(
         log_file,
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5,
         encoding='utf-8'
     )
-    file_handler.setLevel(numeric_level)
     file_handler.setFormatter(formatter)
-    root_logger.addHandler(file_handler)
     
     # Error log súbor
-    error_log_file = os.path.join(logs_dir, "errors.log")
+    error_log_file = logs_path / "errors.log"
     error_handler = logging.handlers.RotatingFileHandler(
         error_log_file,
         maxBytes=5*1024*1024,  # 5MB
@@ -72,7 +108,38 @@ def setup_logging(settings: Optional[AppSettings] = None) -> None:
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(formatter)
-    root_logger.addHandler(error_handler)
+    
+    # intrastat.log sa zapisuje po dávkach (512 záznamov alebo hneď pri ERROR),
+    # errors.log ostáva priamy, aby sa diagnostika pádu nestratila
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=file_handler
+    )
+    
+    # Súbory zapisuje samostatné vlákno - volajúce vlákna len vložia záznam do fronty.
+    # Konzola ostáva synchrónna, aby sa výpisy neprekrývali s print()/input() výzvami.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    # Vo fronte len správa (+ traceback); celý formát aplikujú až cieľové handlery.
+    # Explicitne, inak by basicConfig nastavil log_format aj tu a prefix by bol dvakrát.
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # Root logger konfigurácia - odstránenie starých handlers, level a nové handlers
+    # jedným volaním pod zámkom logging modulu
+    logging.basicConfig(
+        level=numeric_level,
+        handlers=[console_handler, queue_handler],
+        force=True
+    )
+    
+    # Listener z predošlého volania dopíše svoju frontu, potom sa spustí nový
+    global _LISTENER
+    _stop_listener()
+    _LISTENER = logging.handlers.QueueListener(
+        log_queue, buffered_file_handler, error_handler, respect_handler_level=True
+    )
+    _LISTENER.start()
     
     # Log štartu aplikácie
     logging.info("Logging systém bol úspešne inicializovaný")
@@ -83,63 +150,97 @@ def setup_logging(settings: Optional[AppSettings] = None) -> None:
 class ProcessingMetrics:
     """Trieda pre sledovanie metrík spracovania."""
     
+    # Pevná sada atribútov - bez __dict__ na inštanciu
+    __slots__ = (
+        "processed_pdfs", "failed_pdfs", "ai_api_calls", "processing_time",
+        "start_time_ns", "_lock", "logger", "_summary"
+    )
+    
     def __init__(self):
-        self.processed_pdfs = 0
-        self.failed_pdfs = 0
-        self.ai_api_calls = 0
-        self.processing_time = 0.0
-        self.start_time = None
+        # Zámok pre počítadlá - dnes sa volá len z hlavného vlákna, ale metriky
+        # ostanú správne aj pri budúcom paralelnom spracovaní PDF
+        self._lock = threading.Lock()
+        
+        # Súhrn sa aktualizuje na mieste v get_summary (bez nového slovníka pri každom volaní)
+        self._summary = {
+            "total_pdfs": 0,
+            "successful": 0,
+            "failed": 0,
+            "success_rate_percent": 0.0,
+            "total_processing_time_seconds": 0.0,
+            "avg_time_per_pdf_seconds": 0.0,
+            "total_ai_calls": 0
+        }
+        self.reset()
         
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    def reset(self) -> None:
+        """Vynuluje počítadlá a čas pre nové spracovanie."""
+        with self._lock:
+            self.processed_pdfs = 0
+            self.failed_pdfs = 0
+            self.ai_api_calls = 0
+        self.processing_time = 0.0
+        self.start_time_ns = None
+    
     def start_processing(self) -> None:
         """Začne meranie času spracovania."""
-        import time
-        self.start_time = time.time()
+        # Monotónne hodiny - nezávislé od úprav systémového času (NTP)
+        self.start_time_ns = time.monotonic_ns()
         self.logger.info("Začalo spracovanie PDF súborov")
     
     def pdf_processed_successfully(self, pdf_name: str) -> None:
         """Zaznamená úspešne spracovaný PDF."""
-        self.processed_pdfs += 1
-        self.logger.info(f"Úspešne spracovaný PDF: {pdf_name}")
+        with self._lock:
+            self.processed_pdfs += 1
+        self.logger.info("Úspešne spracovaný PDF: %s", pdf_name)
     
     def pdf_failed(self, pdf_name: str, error: str) -> None:
         """Zaznamená neúspešne spracovaný PDF."""
-        self.failed_pdfs += 1
-        self.logger.error(f"Chyba pri spracovaní PDF {pdf_name}: {error}")
+        with self._lock:
+            self.failed_pdfs += 1
+        self.logger.error("Chyba pri spracovaní PDF %s: %s", pdf_name, error)
     
     def ai_call_made(self, model_name: str, operation: str) -> None:
         """Zaznamená AI API volanie."""
-        self.ai_api_calls += 1
-        self.logger.debug(f"AI volanie: {model_name} - {operation}")
+        with self._lock:
+            self.ai_api_calls += 1
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("AI volanie: %s - %s", model_name, operation)
     
     def finish_processing(self) -> None:
         """Ukončí meranie a zapíše súhrn."""
-        if self.start_time:
-            import time
-            self.processing_time = time.time() - self.start_time
+        if self.start_time_ns is not None:
+            self.processing_time = (time.monotonic_ns() - self.start_time_ns) / 1e9
         
         summary = self.get_summary()
         self.logger.info("Spracovanie dokončené")
-        self.logger.info(f"Súhrn: {summary}")
+        self.logger.info("Súhrn: %s", summary)
     
     def get_summary(self) -> dict:
-        """Vráti súhrn metrík."""
+        """
+        Vráti súhrn metrík.
+        
+        Returns:
+            Stále ten istý slovník aktualizovaný na mieste - kto potrebuje snímku, musí si ho skopírovať
+        """
         total_pdfs = self.processed_pdfs + self.failed_pdfs
         success_rate = (self.processed_pdfs / total_pdfs * 100) if total_pdfs > 0 else 0
         avg_time_per_pdf = (self.processing_time / self.processed_pdfs) if self.processed_pdfs > 0 else 0
         
-        return {
-            "total_pdfs": total_pdfs,
-            "successful": self.processed_pdfs,
-            "failed": self.failed_pdfs,
-            "success_rate_percent": round(success_rate, 2),
-            "total_processing_time_seconds": round(self.processing_time, 2),
-            "avg_time_per_pdf_seconds": round(avg_time_per_pdf, 2),
-            "total_ai_calls": self.ai_api_calls
-        }
+        summary = self._summary
+        summary["total_pdfs"] = total_pdfs
+        summary["successful"] = self.processed_pdfs
+        summary["failed"] = self.failed_pdfs
+        summary["success_rate_percent"] = round(success_rate, 2)
+        summary["total_processing_time_seconds"] = round(self.processing_time, 2)
+        summary["avg_time_per_pdf_seconds"] = round(avg_time_per_pdf, 2)
+        summary["total_ai_calls"] = self.ai_api_calls
+        return summary
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     Vráti logger s daným názvom.
@@ -148,6 +249,6 @@ def get_logger(name: str) -> logging.Logger:
         name: Názov loggera (typicky __name__)
     
     Returns:
-        Nakonfigurovaný logger
+        Nakonfigurovaný logger (pre rovnaký názov z cache, bez zámku logging managera)
     """
     return logging.getLogger(name) 
\ No newline at end of file
@@ -1,13 +1,29 @@
 """
 Validátory pre vstupné dáta v Intrastat aplikácii.
 """
+import os
 import re
+import stat
+import sys
 from pathlib import Path
 from typing import Union
 
 from .exceptions import DataValidationError, PDFProcessingError
 
 
+# Predkompilovaný regulárny výraz - bez vyhľadávania v cache modulu re pri každom volaní
+_INVOICE_RE = re.compile(r'^[A-Za-z0-9\-_/\s]+$')
+
+# Špeciálne hodnoty colného kódu (frozenset pre O(1) vyhľadanie). Internované reťazce
+# umožnia zhodu už podľa identity, ak volajúci odovzdá tú istú (internovanú) konštantu.
+_CUSTOMS_SPECIAL = frozenset(
+    sys.intern(special_code) for special_code in ("NEURCENE", "NEPRIRADENÉ", "Zľava", "Poplatok")
+)
+
+# Typy akceptované ako číslo (n-tica sa nevytvára pri každom isinstance)
+_NUMERIC = (int, float)
+
+
 def validate_pdf_file(file_path: Union[str, Path], max_size_mb: int = 50) -> bool:
     """
     Validuje PDF súbor.
@@ -22,19 +38,24 @@ def validate_pdf_file(file_path: Union[str, Path], max_size_mb: int = 50) -> boo
     Raises:
         PDFProcessingError: Ak súbor nie je validný
     """
-    path = Path(file_path)
-    
-    if not path.exists():
+    path = os.fspath(file_path)
+    
+    # Jediné os.stat() namiesto samostatných exists/is_file/stat volaní (bez Path objektu)
+    # (ako pôvodné exists(): každá neplatná cesta - chýbajúci súbor, súbor v ceste
+    # namiesto adresára, chýbajúce práva, nulový znak - je PDFProcessingError)
+    try:
+        file_stat = os.stat(path)
+    except (OSError, ValueError):
         raise PDFProcessingError(f"PDF súbor neexistuje: {file_path}")
     
-    if not path.is_file():
+    if not stat.S_ISREG(file_stat.st_mode):
         raise PDFProcessingError(f"Cesta nie je súbor: {file_path}")
     
-    if not path.suffix.lower() == '.pdf':
+    if not path.lower().endswith('.pdf'):
         raise PDFProcessingError(f"Súbor nie je PDF: {file_path}")
     
     # Kontrola veľkosti súboru
-    file_size_mb = path.stat().st_size / (1024 * 1024)
+    file_size_mb = file_stat.st_size / (1024 * 1024)
     if file_size_mb > max_size_mb:
         raise PDFProcessingError(
             f"PDF súbor je príliš veľký: {file_size_mb:.1f}MB > {max_size_mb}MB"
@@ -61,7 +82,8 @@ def validate_country_code(code: str) -> bool:
     
     code = code.strip().upper()
     
-    if not re.match(r'^[A-Z]{2}$', code):
+    # Bez regexu: po upper() sú ASCII písmená práve A-Z
+    if not (len(code) == 2 and code.isascii() and code.isalpha()):
         raise DataValidationError(
             f"Kód krajiny musí byť 2-písmenový kód (A-Z), dostal: '{code}'"
         )
@@ -88,12 +110,11 @@ def validate_customs_code(code: str) -> bool:
     code = code.strip()
     
     # Povolené sú číselné kódy alebo špeciálne hodnoty
-    special_codes = ["NEURCENE", "NEPRIRADENÉ", "Zľava", "Poplatok"]
-    
-    if code in special_codes:
+    if code in _CUSTOMS_SPECIAL:
         return True
     
-    if not re.match(r'^\d{8}$', code):
+    # Bez regexu: isdecimal() zodpovedá \d (Unicode číslice) v pôvodnom ^\d{8}$
+    if not (len(code) == 8 and code.isdecimal()):
         raise DataValidationError(
             f"Colný kód musí byť 8-ciferný alebo špeciálna hodnota, dostal: '{code}'"
         )
@@ -101,39 +122,81 @@ def validate_customs_code(code: str) -> bool:
     return True
 
 
-def validate_weight(weight: Union[str, int, float], allow_zero: bool = True) -> float:
+def _parse_number(value: Union[str, int, float], field: str, *, allow_negative: bool = False,
+                  allow_zero: bool = True, negative_form: str = "záporná") -> float:
     """
-    Validuje a konvertuje hmotnosť.
+    Spoločná konverzia a kontrola čísla pre validate_weight/quantity/price.
     
     Args:
-        weight: Hmotnosť na validáciu
-        allow_zero: Či je povolená nulová hmotnosť
+        value: Hodnota na validáciu (string môže mať desatinnú čiarku)
+        field: Názov poľa v chybových správach (napr. 'Hmotnosť')
+        allow_negative: Či sú povolené záporné hodnoty
+        allow_zero: Či je povolená nula
+        negative_form: Tvar slova 'záporný' zhodný s rodom poľa
         
     Returns:
-        Validovaná hmotnosť ako float
+        Hodnota ako float
         
     Raises:
-        DataValidationError: Ak hmotnosť nie je validná
+        DataValidationError: Ak hodnota nie je validná
     """
-    if isinstance(weight, str):
+    # Rýchla cesta pre presné float/int (typované hodnoty z AI JSON) bez prechodu MRO
+    value_type = type(value)
+    if value_type is float or value_type is int:
+        pass
+    
+    elif isinstance(value, str):
         # Spracovanie string formátu s čiarkou ako desatinným oddeľovačom
-        weight = weight.strip().replace(',', '.')
+        value = value.strip()
+        if ',' in value:
+            value = value.replace(',', '.')
         
         try:
-            weight = float(weight)
+            value = float(value)
         except ValueError:
-            raise DataValidationError(f"Hmotnosť nie je platné číslo: '{weight}'")
+            raise DataValidationError(f"{field} nie je platné číslo: '{value}'")
+    
+    # Podtriedy (bool, numpy.float64) ostávajú povolené ako doteraz
+    elif not isinstance(value, _NUMERIC):
+        raise DataValidationError(f"{field} musí byť číslo, dostal: {type(value)}")
+    
+    if not allow_negative and value < 0:
+        raise DataValidationError(f"{field} nemôže byť {negative_form}: {value}")
     
-    elif not isinstance(weight, (int, float)):
-        raise DataValidationError(f"Hmotnosť musí byť číslo, dostal: {type(weight)}")
+    if not allow_zero and value == 0:
+        raise DataValidationError(f"{field} nemôže byť nula")
     
-    if weight < 0:
-        raise DataValidationError(f"Hmotnosť nemôže byť záporná: {weight}")
+    return float(value)
+
+
+def validate_weight(weight: Union[str, int, float], allow_zero: bool = True) -> float:
+    """
+    Validuje a konvertuje hmotnosť.
     
-    if not allow_zero and weight == 0:
-        raise DataValidationError("Hmotnosť nemôže byť nula")
+    Args:
+        weight: Hmotnosť na validáciu
+        allow_zero: Či je povolená nulová hmotnosť
+        
+    Returns:
+        Validovaná hmotnosť ako float
+        
+    Raises:
+        DataValidationError: Ak hmotnosť nie je validná
+    """
+    return _parse_number(weight, "Hmotnosť", allow_zero=allow_zero)
+
+
+def format_weight(weight: float) -> str:
+    """
+    Naformátuje hmotnosť na 3 desatinné miesta s čiarkou ako oddeľovačom.
     
-    return float(weight)
+    Args:
+        weight: Hmotnosť v kg
+        
+    Returns:
+        Hmotnosť v slovenskom formáte (napr. '1,250')
+    """
+    return ("%.3f" % weight).replace('.', ',', 1)
 
 
 def validate_quantity(quantity: Union[str, int, float]) -> float:
@@ -149,21 +212,7 @@ def validate_quantity(quantity: Union[str, int, float]) -> float:
     Raises:
         DataValidationError: Ak množstvo nie je validné
     """
-    if isinstance(quantity, str):
-        quantity = quantity.strip().replace(',', '.')
-        
-        try:
-            quantity = float(quantity)
-        except ValueError:
-            raise DataValidationError(f"Množstvo nie je platné číslo: '{quantity}'")
-    
-    elif not isinstance(quantity, (int, float)):
-        raise DataValidationError(f"Množstvo musí byť číslo, dostal: {type(quantity)}")
-    
-    if quantity < 0:
-        raise DataValidationError(f"Množstvo nemôže byť záporné: {quantity}")
-    
-    return float(quantity)
+    return _parse_number(quantity, "Množstvo", negative_form="záporné")
 
 
 def validate_price(price: Union[str, int, float]) -> float:
@@ -179,19 +228,8 @@ def validate_price(price: Union[str, int, float]) -> float:
     Raises:
         DataValidationError: Ak cena nie je validná
     """
-    if isinstance(price, str):
-        price = price.strip().replace(',', '.')
-        
-        try:
-            price = float(price)
-        except ValueError:
-            raise DataValidationError(f"Cena nie je platné číslo: '{price}'")
-    
-    elif not isinstance(price, (int, float)):
-        raise DataValidationError(f"Cena musí byť číslo, dostal: {type(price)}")
-    
     # Cena môže byť záporná (zľavy)
-    return float(price)
+    return _parse_number(price, "Cena", allow_negative=True)
 
 
 def validate_invoice_number(invoice_number: str) -> str:
@@ -218,7 +256,7 @@ def validate_invoice_number(invoice_number: str) -> str:
         raise DataValidationError("Číslo faktúry nemôže byť prázdne")
     
     # Základná validácia - číslo faktúry môže obsahovať písmená, číslice a spojovníky
-    if not re.match(r'^[A-Za-z0-9\-_/\s]+$', invoice_number):
+    if not _INVOICE_RE.match(invoice_number):
         raise DataValidationError(
             f"Číslo faktúry obsahuje nepovolené znaky: '{invoice_number}'"
         )